@@ -110,19 +110,29 @@ def highlight_references(text):
     return Markup(text)
 
 
-def create_app(testing=False):
-    """Create and configure the Flask application."""
+def create_app(testing=False, database_uri=None):
+    """Create and configure the Flask application.
+
+    Args:
+        testing: Use the testing configuration (in-memory SQLite by default)
+        database_uri: Optional database URI overriding the default for the mode
+    """
     app = Flask(__name__)
 
     # Configuration
     app.config['SECRET_KEY'] = SECRET_KEY
     if testing:
+        # Flask-SQLAlchemy gives in-memory SQLite a StaticPool, so the test
+        # client and fixtures share one connection and one database
         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
         app.config['TESTING'] = True
         app.config['WTF_CSRF_ENABLED'] = False
     else:
         app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URI
 
+    if database_uri:
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
     # Ensure directories exist
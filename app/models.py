@@ -6,6 +6,9 @@ from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
+# Hash method for set_password (werkzeug's default); tests swap in a cheap one
+PASSWORD_HASH_METHOD = 'scrypt'
+
 
 class User(UserMixin, db.Model):
     """User model for authentication."""
@@ -19,7 +22,7 @@ class User(UserMixin, db.Model):
 
     def set_password(self, password):
         """Hash and set password."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(password, method=PASSWORD_HASH_METHOD)
 
     def check_password(self, password):
         """Check password against hash."""
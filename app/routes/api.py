@@ -1,11 +1,12 @@
 """API routes for HTMX endpoints."""
-import json
 from datetime import datetime, timezone
 from flask import Blueprint, request, jsonify, render_template
 from flask_login import login_required, current_user
 
 from flask import Response
 
+import orjson
+
 from app.models import db, Book, Chapter, Paragraph, Version, Reference, Group
 from app.config import get_logger
 from app.services.exporter import export_book_json, export_lightrag_json
@@ -293,7 +294,7 @@ def create_version(slug):
 
     version = Version(
         book_id=book.id,
-        snapshot=json.dumps(snapshot, ensure_ascii=False),
+        snapshot=orjson.dumps(snapshot).decode('utf-8'),
         version_type=version_type,
         created_by=current_user.id
     )
@@ -384,14 +385,14 @@ def restore_version(version_id):
     backup_snapshot = _create_book_snapshot(book)
     backup = Version(
         book_id=book.id,
-        snapshot=json.dumps(backup_snapshot, ensure_ascii=False),
+        snapshot=orjson.dumps(backup_snapshot).decode('utf-8'),
         version_type='auto',
         created_by=current_user.id
     )
     db.session.add(backup)
 
     # Restore from version
-    snapshot = json.loads(version.snapshot)
+    snapshot = orjson.loads(version.snapshot)
     _restore_book_from_snapshot(book, snapshot)
 
     book.updated_at = datetime.now(timezone.utc)
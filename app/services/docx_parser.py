@@ -1,5 +1,7 @@
 """DOCX parser service for extracting paragraphs and structure."""
 import re
+import zipfile
+from io import BytesIO
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from docx import Document
@@ -62,13 +64,31 @@ def parse_docx(file_path: Path) -> Dict[str, Any]:
     if not file_path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
 
+    return parse_docx_from_bytes(file_path.read_bytes(), source=str(file_path))
+
+
+def parse_docx_from_bytes(data: bytes, source: str = '<bytes>') -> Dict[str, Any]:
+    """Parse DOCX content already held in memory.
+
+    Lets callers that parse the same document repeatedly read it once.
+
+    Args:
+        data: Raw contents of a DOCX file
+        source: Name used in log messages and errors
+
+    Returns:
+        Dict containing 'paragraphs' list and 'chapters' list
+
+    Raises:
+        ValueError: If data is not a valid DOCX
+    """
     try:
-        doc = Document(file_path)
-    except PackageNotFoundError as e:
-        logger.error("docx_parse_failed", file=str(file_path), error="Invalid DOCX format")
-        raise ValueError(f"Invalid DOCX file: {file_path}") from e
+        doc = Document(BytesIO(data))
+    except (PackageNotFoundError, zipfile.BadZipFile) as e:
+        logger.error("docx_parse_failed", file=source, error="Invalid DOCX format")
+        raise ValueError(f"Invalid DOCX file: {source}") from e
     except Exception as e:
-        logger.error("docx_parse_failed", file=str(file_path), error=str(e))
+        logger.error("docx_parse_failed", file=source, error=str(e))
         raise
 
     paragraphs = []
@@ -123,7 +143,7 @@ def parse_docx(file_path: Path) -> Dict[str, Any]:
         }]
 
     logger.info("docx_parsed",
-                file=str(file_path),
+                file=source,
                 paragraph_count=len(paragraphs),
                 chapter_count=len(chapters))
 
@@ -1,7 +1,11 @@
 """Export service for Book JSON and LightRAG JSON formats."""
-import json
+import gzip
 from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Any, Optional
+
+import orjson
 
 from app.config import get_logger
 
@@ -10,6 +14,28 @@ logger = get_logger()
 # Fields to exclude from paragraph export
 INTERNAL_FIELDS = {'_sa_instance_state', 'created_at', 'updated_at', 'book_id', 'book'}
 
+# Top-level keys validate_export_data requires
+EXPORT_REQUIRED_KEYS = ('title', 'paragraphs', 'groups')
+
+# Paragraph fields copied into the export; optional ones only when not None
+PARAGRAPH_CORE_FIELDS = ('id', 'text', 'order_index')
+PARAGRAPH_OPTIONAL_FIELDS = (
+    'chapter_title', 'page_number', 'is_heading', 'heading_level',
+    'quran_refs', 'hadith_refs', 'footnotes', 'group_id', 'token_count',
+)
+
+# Two-space indented output with raw UTF-8; int keys (e.g. page numbers)
+# are written as strings like the stdlib encoder does
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+# One compact object per line for NDJSON output
+NDJSON_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
+
+def _dumps(data: Any) -> str:
+    """Serialize export data to an indented JSON string."""
+    return orjson.dumps(data, option=JSON_OPTIONS).decode('utf-8')
+
 
 def build_paragraph_export(para: Dict[str, Any]) -> Dict[str, Any]:
     """Build export dict for a single paragraph.
@@ -23,18 +49,15 @@ def build_paragraph_export(para: Dict[str, Any]) -> Dict[str, Any]:
     result = {}
 
     # Always include core fields
-    for key in ['id', 'text', 'order_index']:
+    for key in PARAGRAPH_CORE_FIELDS:
         if key in para:
             result[key] = para[key]
 
     # Include optional fields if present
-    optional_fields = [
-        'chapter_title', 'page_number', 'is_heading', 'heading_level',
-        'quran_refs', 'hadith_refs', 'footnotes', 'group_id', 'token_count',
-    ]
-    for key in optional_fields:
-        if key in para and para[key] is not None:
-            result[key] = para[key]
+    for key in PARAGRAPH_OPTIONAL_FIELDS:
+        value = para.get(key)
+        if value is not None:
+            result[key] = value
 
     return result
 
@@ -66,21 +89,13 @@ def validate_export_data(data: Optional[Dict[str, Any]]) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    if not data or not isinstance(data, dict):
-        return False
-
-    # Required top-level keys
-    required_keys = ['title', 'paragraphs', 'groups']
-    for key in required_keys:
-        if key not in data:
-            return False
-
-    # Validate paragraphs have required fields
-    for para in data.get('paragraphs', []):
-        if 'id' not in para or 'text' not in para:
-            return False
-
-    return True
+    # Cheapest structural checks first; paragraphs are only walked once the
+    # top-level shape is known to be right
+    return (
+        isinstance(data, dict)
+        and all(key in data for key in EXPORT_REQUIRED_KEYS)
+        and all('id' in para and 'text' in para for para in data['paragraphs'])
+    )
 
 
 def export_book_json(data: Dict[str, Any]) -> str:
@@ -97,6 +112,37 @@ def export_book_json(data: Dict[str, Any]) -> str:
     Returns:
         JSON string
     """
+    return _dumps(_build_book_export(data))
+
+
+def export_book_json_to_file(data: Dict[str, Any], path: Path) -> Path:
+    """Write Book JSON for data to a file, gzipped if the name ends in .gz.
+
+    The encoded bytes go straight to disk without a str round trip.
+    Compression uses level 1: JSON text already shrinks well at the
+    fastest level, and higher levels mostly add CPU time.
+
+    Args:
+        data: Book data dict with paragraphs and groups
+        path: Output file path
+
+    Returns:
+        The path written
+    """
+    path = Path(path)
+    encoded = orjson.dumps(_build_book_export(data), option=JSON_OPTIONS)
+
+    if path.suffix == '.gz':
+        with gzip.open(path, 'wb', compresslevel=1) as fp:
+            fp.write(encoded)
+    else:
+        path.write_bytes(encoded)
+
+    return path
+
+
+def _build_book_export(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the Book JSON export dict for data."""
     export = {
         'exported_at': datetime.now(timezone.utc).isoformat(),
         'format': 'book_json',
@@ -132,7 +178,65 @@ def export_book_json(data: Dict[str, Any]) -> str:
                  paragraphs=len(export['paragraphs']),
                  groups=len(export['groups']))
 
-    return json.dumps(export, ensure_ascii=False, indent=2)
+    return export
+
+
+def _build_lightrag_chunk(data: Dict[str, Any], group: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the LightRAG chunk for a single group.
+
+    Args:
+        data: Book data dict the group belongs to
+        group: Group dict with paragraphs
+
+    Returns:
+        Chunk dict with 'content' and 'metadata'
+    """
+    # Combine paragraph texts
+    para_texts = [p.get('text', '') for p in group.get('paragraphs', [])]
+    content = '\n\n'.join(para_texts)
+
+    # Extract paragraph IDs
+    para_ids = [p['id'] for p in group.get('paragraphs', [])]
+
+    # Build metadata
+    metadata = {
+        'source': data.get('slug', ''),
+        'title': data.get('title', ''),
+        'author': data.get('author', ''),
+        'chunk_index': group['order_index'],
+        'token_count': group['token_count'],
+        'paragraph_ids': para_ids,
+    }
+
+    # Include chapter if all paragraphs in same chapter
+    chapters = set()
+    for para in group.get('paragraphs', []):
+        if 'chapter_title' in para:
+            chapters.add(para['chapter_title'])
+    if len(chapters) == 1:
+        metadata['chapter'] = list(chapters)[0]
+
+    # Include page range if available
+    pages = []
+    for para in group.get('paragraphs', []):
+        if 'page_number' in para and para['page_number']:
+            pages.append(para['page_number'])
+    if pages:
+        metadata['page_start'] = min(pages)
+        metadata['page_end'] = max(pages)
+
+    return {
+        'content': content,
+        'metadata': metadata,
+    }
+
+
+def _encode_lightrag_chunk(book: Dict[str, Any], group: Dict[str, Any]) -> bytes:
+    """Build and encode one chunk, indented for its place in the chunk list."""
+    encoded = orjson.dumps(_build_lightrag_chunk(book, group), option=JSON_OPTIONS)
+    # Chunks contain no raw newlines besides the indentation, so nesting
+    # them one level inside the list only needs every line shifted
+    return encoded.replace(b'\n', b'\n  ')
 
 
 def export_lightrag_json(data: Dict[str, Any]) -> str:
@@ -148,53 +252,74 @@ def export_lightrag_json(data: Dict[str, Any]) -> str:
     Returns:
         JSON string (list of chunks)
     """
-    chunks = []
+    buffer = BytesIO()
+    export_lightrag_json_stream(data, buffer)
+    return buffer.getvalue().decode('utf-8')
 
-    for group in data.get('groups', []):
-        # Combine paragraph texts
-        para_texts = [p.get('text', '') for p in group.get('paragraphs', [])]
-        content = '\n\n'.join(para_texts)
-
-        # Extract paragraph IDs
-        para_ids = [p['id'] for p in group.get('paragraphs', [])]
-
-        # Build metadata
-        metadata = {
-            'source': data.get('slug', ''),
-            'title': data.get('title', ''),
-            'author': data.get('author', ''),
-            'chunk_index': group['order_index'],
-            'token_count': group['token_count'],
-            'paragraph_ids': para_ids,
-        }
-
-        # Include chapter if all paragraphs in same chapter
-        chapters = set()
-        for para in group.get('paragraphs', []):
-            if 'chapter_title' in para:
-                chapters.add(para['chapter_title'])
-        if len(chapters) == 1:
-            metadata['chapter'] = list(chapters)[0]
 
-        # Include page range if available
-        pages = []
-        for para in group.get('paragraphs', []):
-            if 'page_number' in para and para['page_number']:
-                pages.append(para['page_number'])
-        if pages:
-            metadata['page_start'] = min(pages)
-            metadata['page_end'] = max(pages)
+def export_lightrag_json_stream(data: Dict[str, Any], fp: BinaryIO) -> int:
+    """Write LightRAG JSON to a binary file object one chunk at a time.
+
+    Only one chunk is held in memory at once. The bytes written are the same
+    as export_lightrag_json returns, encoded as UTF-8.
+
+    Args:
+        data: Book data dict with paragraphs and groups
+        fp: Binary file object to write to; it is not flushed or closed
 
-        chunks.append({
-            'content': content,
-            'metadata': metadata,
-        })
+    Returns:
+        Number of chunks written
+    """
+    groups = data.get('groups', [])
+    # Chunk metadata only needs these book fields
+    book = {key: data[key] for key in ('slug', 'title', 'author') if key in data}
+
+    count = _write_lightrag_chunks(
+        fp, (_encode_lightrag_chunk(book, group) for group in groups))
 
     logger.debug("lightrag_json_exported",
                  title=data.get('title'),
-                 chunks=len(chunks))
+                 chunks=count)
+
+    return count
+
+
+def _write_lightrag_chunks(fp: BinaryIO, encoded_chunks: Iterable[bytes]) -> int:
+    """Write encoded chunks to fp as a JSON list and return how many."""
+    count = 0
+    for encoded in encoded_chunks:
+        fp.write(b',\n  ' if count else b'[\n  ')
+        fp.write(encoded)
+        count += 1
+    fp.write(b'\n]' if count else b'[]')
+    return count
+
+
+def export_lightrag_ndjson(data: Dict[str, Any]) -> bytes:
+    """Export book data as LightRAG chunks in newline-delimited JSON.
+
+    One compact JSON object per line, in the same order and with the same
+    content as the export_lightrag_json list, for consumers that ingest
+    chunks as a stream.
+
+    Args:
+        data: Book data dict with paragraphs and groups
+
+    Returns:
+        UTF-8 encoded NDJSON, each line ending in a newline
+    """
+    book = {key: data[key] for key in ('slug', 'title', 'author') if key in data}
+    groups = data.get('groups', [])
+    ndjson = b''.join(
+        orjson.dumps(_build_lightrag_chunk(book, group), option=NDJSON_OPTIONS)
+        for group in groups
+    )
+
+    logger.debug("lightrag_ndjson_exported",
+                 title=data.get('title'),
+                 chunks=len(groups))
 
-    return json.dumps(chunks, ensure_ascii=False, indent=2)
+    return ndjson
 
 
 def export_for_custom_kg(data: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -1,6 +1,7 @@
 """Footnote detection and linking service."""
 import re
-from typing import Dict, List, Any
+from functools import lru_cache
+from typing import Dict, Iterator, List, Any, Tuple
 
 from app.config import get_logger
 
@@ -12,6 +13,65 @@ SUPERSCRIPT_MAP = {
     '⁶': '6', '⁷': '7', '⁸': '8', '⁹': '9', '⁰': '0',
 }
 
+# Every marker style starts with one of these characters, so text without
+# any of them cannot contain a marker. A plain character class is scanned far
+# faster than the marker alternation, whose lookbehind defeats the regex
+# engine's first-character skip.
+_MARKER_PREFILTER = re.compile(r'[¹²³⁴⁵⁶⁷⁸⁹⁰\[(*†‡]')
+
+# Footnote markers in paragraph text, one named group per style. The styles
+# start with disjoint characters, so a single scan finds the same markers as
+# one scan per style, already in position order.
+_MARKER_RE = re.compile(
+    r'(?P<superscript>[¹²³⁴⁵⁶⁷⁸⁹⁰]+)'
+    r'|\[(?P<bracket>\d+)\]'
+    r'|(?<=[^\d])\((?P<paren>\d+)\)(?=[^\d]|$)'
+    r'|(?P<asterisk>\*+)'
+    r'|(?P<dagger>[†‡]+)')
+
+# Footnote definitions - "1. content" or "1) content"
+_NUMBERED_FOOTNOTE_RE = re.compile(
+    r'^[\s]*(\d+)[.)\s]+(.+?)(?=\n\s*\d+[.)]|\n\s*\[|\n\s*[¹²³⁴⁵⁶⁷⁸⁹]|$)',
+    re.MULTILINE | re.DOTALL)
+
+# Footnote definitions - "[1] content"
+_BRACKET_FOOTNOTE_RE = re.compile(
+    r'^\s*\[(\d+)\]\s*(.+?)(?=\n\s*\[|\n\s*\d+[.)]|$)',
+    re.MULTILINE | re.DOTALL)
+
+# Footnote definitions - "¹ content"
+_SUPERSCRIPT_FOOTNOTE_RE = re.compile(
+    r'^[\s]*([¹²³⁴⁵⁶⁷⁸⁹⁰]+)\s*(.+?)(?=\n\s*[¹²³⁴⁵⁶⁷⁸⁹]|$)',
+    re.MULTILINE | re.DOTALL)
+
+# Number or marker prefix of a raw footnote - "N. ", "N) ", "¹ ", "* "
+_FOOTNOTE_PREFIX_RE = re.compile(r'^[\s]*(\d+|[¹²³⁴⁵⁶⁷⁸⁹⁰]+|\*+|[†‡]+)[.)\]\s]+')
+_BRACKET_PREFIX_RE = re.compile(r'^\[(\d+)\]\s*')
+
+
+def _iter_markers(text: str) -> Iterator[Tuple[str, int, str]]:
+    """Yield (marker, position, raw) for each footnote marker in text.
+
+    Shared by detect_footnote_markers and link_footnotes so linking can
+    consume markers without building a dict per marker first.
+    """
+    if not text or not _MARKER_PREFILTER.search(text):
+        return
+
+    for match in _MARKER_RE.finditer(text):
+        style = match.lastgroup
+        if style == 'superscript':
+            # Convert to regular digits
+            marker = ''.join(SUPERSCRIPT_MAP.get(c, c) for c in match.group())
+        elif style == 'asterisk':
+            # Only match if not part of emphasis (*word*)
+            if match.start() != 0 and text[match.start()-1] in ' \t\n':
+                continue
+            marker = match.group()
+        else:
+            marker = match.group(style)
+        yield marker, match.start(), match.group()
+
 
 def detect_footnote_markers(text: str) -> List[Dict[str, Any]]:
     """Detect footnote markers in paragraph text.
@@ -32,54 +92,10 @@ def detect_footnote_markers(text: str) -> List[Dict[str, Any]]:
     if not text:
         return []
 
-    markers = []
-
-    # Pattern 1: Unicode superscript digits
-    for match in re.finditer(r'[¹²³⁴⁵⁶⁷⁸⁹⁰]+', text):
-        # Convert to regular digits
-        marker = ''.join(SUPERSCRIPT_MAP.get(c, c) for c in match.group())
-        markers.append({
-            'marker': marker,
-            'position': match.start(),
-            'raw': match.group(),
-        })
-
-    # Pattern 2: Bracketed numbers [1], [12]
-    for match in re.finditer(r'\[(\d+)\]', text):
-        markers.append({
-            'marker': match.group(1),
-            'position': match.start(),
-            'raw': match.group(),
-        })
-
-    # Pattern 3: Parenthetical numbers at word boundary (1), (2)
-    for match in re.finditer(r'(?<=[^\d])\((\d+)\)(?=[^\d]|$)', text):
-        markers.append({
-            'marker': match.group(1),
-            'position': match.start(),
-            'raw': match.group(),
-        })
-
-    # Pattern 4: Asterisk markers
-    for match in re.finditer(r'\*+', text):
-        # Only match if not part of emphasis (*word*)
-        if match.start() == 0 or text[match.start()-1] not in ' \t\n':
-            markers.append({
-                'marker': match.group(),
-                'position': match.start(),
-                'raw': match.group(),
-            })
-
-    # Pattern 5: Dagger markers
-    for match in re.finditer(r'[†‡]+', text):
-        markers.append({
-            'marker': match.group(),
-            'position': match.start(),
-            'raw': match.group(),
-        })
-
-    # Sort by position and remove duplicates
-    markers.sort(key=lambda x: x['position'])
+    markers = [
+        {'marker': marker, 'position': position, 'raw': raw}
+        for marker, position, raw in _iter_markers(text)
+    ]
 
     logger.debug("footnote_markers_detected", count=len(markers), text_length=len(text))
     return markers
@@ -108,7 +124,7 @@ def detect_footnotes(text: str) -> List[Dict[str, Any]]:
     seen_numbers = set()
 
     # Pattern 1: "1. content" or "1) content"
-    for match in re.finditer(r'^[\s]*(\d+)[.)\s]+(.+?)(?=\n\s*\d+[.)]|\n\s*\[|\n\s*[¹²³⁴⁵⁶⁷⁸⁹]|$)', text, re.MULTILINE | re.DOTALL):
+    for match in _NUMBERED_FOOTNOTE_RE.finditer(text):
         number = match.group(1)
         content = match.group(2).strip()
         if number not in seen_numbers and content:
@@ -119,7 +135,7 @@ def detect_footnotes(text: str) -> List[Dict[str, Any]]:
             })
 
     # Pattern 2: "[1] content"
-    for match in re.finditer(r'^\s*\[(\d+)\]\s*(.+?)(?=\n\s*\[|\n\s*\d+[.)]|$)', text, re.MULTILINE | re.DOTALL):
+    for match in _BRACKET_FOOTNOTE_RE.finditer(text):
         number = match.group(1)
         content = match.group(2).strip()
         if number not in seen_numbers and content:
@@ -130,7 +146,7 @@ def detect_footnotes(text: str) -> List[Dict[str, Any]]:
             })
 
     # Pattern 3: "¹ content" (superscript)
-    for match in re.finditer(r'^[\s]*([¹²³⁴⁵⁶⁷⁸⁹⁰]+)\s*(.+?)(?=\n\s*[¹²³⁴⁵⁶⁷⁸⁹]|$)', text, re.MULTILINE | re.DOTALL):
+    for match in _SUPERSCRIPT_FOOTNOTE_RE.finditer(text):
         raw_number = match.group(1)
         number = ''.join(SUPERSCRIPT_MAP.get(c, c) for c in raw_number)
         content = match.group(2).strip()
@@ -145,6 +161,8 @@ def detect_footnotes(text: str) -> List[Dict[str, Any]]:
     return footnotes
 
 
+# Cached on the raw string; the result is an immutable str, so sharing is safe
+@lru_cache(maxsize=4096)
 def extract_footnote_content(raw_footnote: str) -> str:
     """Extract the content from a raw footnote string.
 
@@ -163,8 +181,8 @@ def extract_footnote_content(raw_footnote: str) -> str:
     content = raw_footnote.strip()
 
     # Pattern: "N. " or "N) " or "[N] " or "¹ " or "* "
-    content = re.sub(r'^[\s]*(\d+|[¹²³⁴⁵⁶⁷⁸⁹⁰]+|\*+|[†‡]+)[.)\]\s]+', '', content)
-    content = re.sub(r'^\[(\d+)\]\s*', '', content)
+    content = _FOOTNOTE_PREFIX_RE.sub('', content)
+    content = _BRACKET_PREFIX_RE.sub('', content)
 
     return content.strip()
 
@@ -185,24 +203,22 @@ def link_footnotes(
     if not para_text or not footnotes:
         return []
 
-    # Detect markers in paragraph
-    markers = detect_footnote_markers(para_text)
-
     # Create footnote lookup by number
     footnote_lookup = {fn['number']: fn['content'] for fn in footnotes}
 
-    # Link markers to footnotes
+    # Link markers in paragraph to footnotes
     links = []
-    for marker in markers:
-        marker_num = marker['marker']
+    markers_found = 0
+    for marker_num, position, _ in _iter_markers(para_text):
+        markers_found += 1
         if marker_num in footnote_lookup:
             links.append({
                 'marker': marker_num,
                 'content': footnote_lookup[marker_num],
-                'position': marker['position'],
+                'position': position,
             })
 
     logger.debug("footnotes_linked",
-                 markers_found=len(markers),
+                 markers_found=markers_found,
                  links_created=len(links))
     return links
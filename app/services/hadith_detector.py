@@ -1,5 +1,6 @@
 """Hadith reference detection service."""
 import re
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 
 from app.config import get_logger
@@ -72,6 +73,53 @@ COLLECTION_FULL_NAMES = {
 }
 
 
+# Name prefixes dropped by normalize_collection_name - "Sahih al-Bukhari"
+_TITLE_PREFIX_RE = re.compile(r'^(sahih|saheeh|sunan|jami|musnad)\s*')
+_ARTICLE_PREFIX_RE = re.compile(r'^(al-|an-|at-|ad-)')
+
+# Characters dropped after the prefixes - "Abu Dawud", "Ibn-Majah", "Nasa'i"
+_NAME_STRIP_TABLE = str.maketrans('', '', " -'")
+
+# Collection keywords for pattern matching
+_COLLECTION_KEYWORDS = (
+    r'bukhari|bukhaaree|bukhaari|'
+    r'muslim|'
+    r'abu\s*dawu?d|abu\s*dawood|'
+    r'tirmidhi|tirmizi|tirmidhee|'
+    r'ibn\s*majah?|'
+    r'nasai|nasa\'?i|'
+    r'muwatta(?:\s+malik)?|malik\'?s?\s+muwatta|'
+    r'ahmad|ahmed|'
+    r'darimi|daarimi|'
+    r'bayhaqi|bayhaqee'
+)
+
+# Collection followed by number - "Bukhari 1234" or "Sahih al-Bukhari, no. 1234"
+_NUMBER_REF_RE = re.compile(rf'''
+    (?:sahih|saheeh|sunan|jami|musnad)?\s*
+    (?:al-|an-|at-|ad-)?
+    ({_COLLECTION_KEYWORDS})
+    [\s,.:]*
+    (?:no\.?|[#]|hadith)?\s*
+    (\d+)
+''', re.IGNORECASE | re.VERBOSE)
+
+# Book/Chapter format - "Bukhari, Book 1, Hadith 1" or "Muslim Book 5 Hadith 23"
+_BOOK_REF_RE = re.compile(rf'''
+    (?:sahih|saheeh|sunan|jami|musnad)?\s*
+    (?:al-|an-|at-|ad-)?
+    ({_COLLECTION_KEYWORDS})
+    [\s,]*
+    (?:book|vol\.?|volume)\s*
+    (\d+)
+    [\s,]*
+    (?:hadith|no\.?|[#])?\s*
+    (\d+)
+''', re.IGNORECASE | re.VERBOSE)
+
+
+# The same few spellings recur across a book, so cache the normalization
+@lru_cache(maxsize=4096)
 def normalize_collection_name(name: str) -> Optional[str]:
     """Normalize a collection name to its canonical form.
 
@@ -86,9 +134,9 @@ def normalize_collection_name(name: str) -> Optional[str]:
 
     # Normalize: lowercase, remove common prefixes and special chars
     normalized = name.lower().strip()
-    normalized = re.sub(r'^(sahih|saheeh|sunan|jami|musnad)\s*', '', normalized)
-    normalized = re.sub(r'^(al-|an-|at-|ad-)', '', normalized)
-    normalized = normalized.replace(' ', '').replace('-', '').replace("'", '')
+    normalized = _TITLE_PREFIX_RE.sub('', normalized)
+    normalized = _ARTICLE_PREFIX_RE.sub('', normalized)
+    normalized = normalized.translate(_NAME_STRIP_TABLE)
 
     return COLLECTION_NAMES.get(normalized)
 
@@ -115,32 +163,8 @@ def detect_hadith_refs(text: str) -> List[Dict[str, Any]]:
     refs = []
     seen = set()
 
-    # Collection keywords for pattern matching
-    collection_keywords = (
-        r'bukhari|bukhaaree|bukhaari|'
-        r'muslim|'
-        r'abu\s*dawu?d|abu\s*dawood|'
-        r'tirmidhi|tirmizi|tirmidhee|'
-        r'ibn\s*majah?|'
-        r'nasai|nasa\'?i|'
-        r'muwatta(?:\s+malik)?|malik\'?s?\s+muwatta|'
-        r'ahmad|ahmed|'
-        r'darimi|daarimi|'
-        r'bayhaqi|bayhaqee'
-    )
-
     # Pattern 1: Collection followed by number
-    # e.g., "Bukhari 1234" or "Sahih al-Bukhari, no. 1234"
-    pattern1 = rf'''
-        (?:sahih|saheeh|sunan|jami|musnad)?\s*
-        (?:al-|an-|at-|ad-)?
-        ({collection_keywords})
-        [\s,.:]*
-        (?:no\.?|[#]|hadith)?\s*
-        (\d+)
-    '''
-
-    for match in re.finditer(pattern1, text, re.IGNORECASE | re.VERBOSE):
+    for match in _NUMBER_REF_RE.finditer(text):
         collection_raw = match.group(1)
         number = match.group(2)
 
@@ -158,20 +182,7 @@ def detect_hadith_refs(text: str) -> List[Dict[str, Any]]:
                 })
 
     # Pattern 2: Book/Chapter format
-    # e.g., "Bukhari, Book 1, Hadith 1" or "Muslim Book 5 Hadith 23"
-    pattern2 = rf'''
-        (?:sahih|saheeh|sunan|jami|musnad)?\s*
-        (?:al-|an-|at-|ad-)?
-        ({collection_keywords})
-        [\s,]*
-        (?:book|vol\.?|volume)\s*
-        (\d+)
-        [\s,]*
-        (?:hadith|no\.?|[#])?\s*
-        (\d+)
-    '''
-
-    for match in re.finditer(pattern2, text, re.IGNORECASE | re.VERBOSE):
+    for match in _BOOK_REF_RE.finditer(text):
         collection_raw = match.group(1)
         book_num = match.group(2)
         hadith_num = match.group(3)
@@ -1,7 +1,6 @@
 """PDF matcher service for extracting pages and matching paragraphs."""
-import re
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import AbstractSet, Dict, Iterable, List, Any, Optional
 import fitz  # PyMuPDF
 
 from app.config import get_logger
@@ -11,6 +10,10 @@ logger = get_logger()
 # Minimum confidence threshold for a valid match
 MIN_CONFIDENCE_THRESHOLD = 0.3
 
+# Weights of word overlap and longest consecutive phrase in the similarity score
+OVERLAP_WEIGHT = 0.4
+PHRASE_WEIGHT = 0.6
+
 
 def normalize_text(text: str) -> str:
     """Normalize text for comparison.
@@ -23,15 +26,51 @@ def normalize_text(text: str) -> str:
     """
     if not text:
         return ""
-    # Convert to lowercase
-    text = text.lower()
-    # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text)
-    # Strip leading/trailing whitespace
-    return text.strip()
+    # Lowercase, then collapse whitespace runs and strip the ends in one pass
+    # (str.split() uses the same whitespace definition as the regex \s)
+    return ' '.join(text.lower().split())
+
+
+def _longest_phrase_len(words: List[str], target: str) -> int:
+    """Find the longest run of consecutive words found verbatim in target.
+
+    Any sub-run of a phrase contained in target is itself contained, so a
+    sliding window needs only O(len(words)) substring checks. Phrases are
+    sliced out of the joined words by character offset rather than rebuilt
+    with str.join for every check.
 
+    Args:
+        words: Search words in order
+        target: Normalized text to search
 
-def calculate_similarity(text1: str, text2: str) -> float:
+    Returns:
+        Number of words in the longest contained run
+    """
+    joined = ' '.join(words)
+    starts = []
+    ends = []
+    offset = 0
+    for word in words:
+        starts.append(offset)
+        offset += len(word)
+        ends.append(offset)
+        offset += 1
+
+    longest = 0
+    end = 0
+    for start in range(len(words)):
+        end = max(end, start)
+        while end < len(words) and joined[starts[start]:ends[end]] in target:
+            end += 1
+        longest = max(longest, end - start)
+    return longest
+
+
+def calculate_similarity(
+    text1: str,
+    text2: str,
+    words2_set: Optional[AbstractSet[str]] = None
+) -> float:
     """Calculate similarity between two texts.
 
     Uses a combination of:
@@ -41,6 +80,7 @@ def calculate_similarity(text1: str, text2: str) -> float:
     Args:
         text1: Search text (typically paragraph)
         text2: Target text (typically page content)
+        words2_set: Optional precomputed set of normalized words in text2
 
     Returns:
         Similarity score between 0.0 and 1.0
@@ -58,32 +98,42 @@ def calculate_similarity(text1: str, text2: str) -> float:
 
     # Split into words
     words1 = norm1.split()
-    words2_set = set(norm2.split())
+    if words2_set is None:
+        words2_set = set(norm2.split())
 
     if not words1:
         return 0.0
 
+    return _score_words(words1, norm2, words2_set)
+
+
+def _score_words(words1: List[str], norm2: str, words2_set: AbstractSet[str]) -> float:
+    """Score pre-split search words against normalized target text.
+
+    The exact-containment check is left to the caller.
+
+    Args:
+        words1: Non-empty list of normalized search words
+        norm2: Normalized target text
+        words2_set: Set of words in norm2
+
+    Returns:
+        Similarity score between 0.0 and 1.0
+    """
     # Count how many of the search words appear in target
-    matches = sum(1 for w in words1 if w in words2_set)
+    matches = sum(map(words2_set.__contains__, words1))
+    if matches == 0:
+        # No whole word in common; fragments inside longer words are not evidence
+        return 0.0
     overlap_ratio = matches / len(words1)
 
     # Check for consecutive word matches (phrase detection)
     # This helps distinguish "page 1" from "page 2" even when both contain common words
-    words1_str = ' '.join(words1)
-    consecutive_match_score = 0.0
-
-    # Try to find the longest consecutive match
-    for i in range(len(words1)):
-        for j in range(len(words1), i, -1):
-            phrase = ' '.join(words1[i:j])
-            if phrase in norm2:
-                phrase_len = j - i
-                consecutive_match_score = max(consecutive_match_score, phrase_len / len(words1))
-                break
+    consecutive_match_score = _longest_phrase_len(words1, norm2) / len(words1)
 
     # Combine overlap and consecutive match
     # Consecutive matches are weighted higher for differentiation
-    final_score = overlap_ratio * 0.4 + consecutive_match_score * 0.6
+    final_score = overlap_ratio * OVERLAP_WEIGHT + consecutive_match_score * PHRASE_WEIGHT
 
     return min(1.0, final_score)
 
@@ -95,7 +145,8 @@ def extract_pdf_pages(file_path: Path) -> List[Dict[str, Any]]:
         file_path: Path to the PDF file
 
     Returns:
-        List of dicts with 'page_number' and 'text' for each page
+        List of dicts with 'page_number', 'text', 'text_normalized', and the
+        page's normalized 'words' (tuple) and 'words_set' (frozenset)
 
     Raises:
         FileNotFoundError: If file doesn't exist
@@ -112,10 +163,14 @@ def extract_pdf_pages(file_path: Path) -> List[Dict[str, Any]]:
 
         for page_num, page in enumerate(doc, start=1):
             text = page.get_text("text")
+            text_normalized = normalize_text(text)
+            words = tuple(text_normalized.split())
             pages.append({
                 'page_number': page_num,
                 'text': text,
-                'text_normalized': normalize_text(text),
+                'text_normalized': text_normalized,
+                'words': words,
+                'words_set': frozenset(words),
             })
 
         doc.close()
@@ -133,17 +188,44 @@ def extract_pdf_pages(file_path: Path) -> List[Dict[str, Any]]:
     return pages
 
 
+def build_page_index(pages: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """Build an inverted index from normalized words to page positions.
+
+    Args:
+        pages: List of page dicts from extract_pdf_pages
+
+    Returns:
+        Dict mapping each word to the list positions of pages containing it
+    """
+    index: Dict[str, List[int]] = {}
+    for pos, page in enumerate(pages):
+        words_set = page.get('words_set')
+        if words_set is None:
+            page_text = page.get('text_normalized') or normalize_text(page.get('text', ''))
+            words_set = set(page_text.split())
+        for word in words_set:
+            index.setdefault(word, []).append(pos)
+    return index
+
+
 def match_paragraph_to_page(
     para_text: str,
     pages: List[Dict[str, Any]],
-    min_confidence: float = MIN_CONFIDENCE_THRESHOLD
+    min_confidence: float = MIN_CONFIDENCE_THRESHOLD,
+    page_index: Optional[Dict[str, List[int]]] = None
 ) -> Dict[str, Any]:
     """Match a paragraph to the most likely PDF page.
 
+    Word overlap with every page is counted in one pass over the inverted
+    index. Pages are then scored in order of decreasing overlap, stopping once
+    the overlap-based upper bound shows no remaining page can beat the best
+    score.
+
     Args:
         para_text: The paragraph text to match
         pages: List of page dicts from extract_pdf_pages
         min_confidence: Minimum confidence threshold for a valid match
+        page_index: Optional index from build_page_index, built if omitted
 
     Returns:
         Dict with 'page_number' (int or None) and 'confidence' (float)
@@ -151,28 +233,109 @@ def match_paragraph_to_page(
     if not para_text or not pages:
         return {'page_number': None, 'confidence': 0.0}
 
-    best_page = None
+    norm_para = normalize_text(para_text)
+    words = norm_para.split()
+    if not words:
+        return {'page_number': None, 'confidence': 0.0}
+
+    page_texts = [
+        page.get('text_normalized') or normalize_text(page.get('text', ''))
+        for page in pages
+    ]
+
+    if page_index is None:
+        page_index = build_page_index(pages)
+
+    # Exact containment scores 1.0 and can match inside words, so it is
+    # checked directly rather than bounded by word overlap
+    for pos in _containment_candidates(words, page_index, len(pages)):
+        if page_texts[pos] and norm_para in page_texts[pos]:
+            return _build_match(pages[pos]['page_number'], 1.0, min_confidence)
+
+    overlap_counts = [0] * len(pages)
+    for word in words:
+        for pos in page_index.get(word, ()):
+            overlap_counts[pos] += 1
+
+    best_pos = None
     best_score = 0.0
 
-    norm_para = normalize_text(para_text)
+    for pos in sorted(range(len(pages)), key=lambda i: (-overlap_counts[i], i)):
+        # Pages are visited by decreasing overlap, so the rest score zero too
+        if overlap_counts[pos] == 0:
+            break
 
-    for page in pages:
-        page_text = page.get('text_normalized') or normalize_text(page.get('text', ''))
+        if _score_upper_bound(overlap_counts[pos], len(words)) < best_score:
+            break
 
-        if not page_text:
+        if not page_texts[pos]:
             continue
 
-        score = calculate_similarity(norm_para, page_text)
+        words_set = pages[pos].get('words_set')
+        if words_set is None:
+            words_set = set(page_texts[pos].split())
 
-        if score > best_score:
+        # Paragraph is already normalized and split, and containment was ruled out above
+        score = _score_words(words, page_texts[pos], words_set)
+
+        # Ties go to the earliest page, as in a plain front-to-back scan
+        if score > best_score or (score == best_score and best_pos is not None and pos < best_pos):
             best_score = score
-            best_page = page['page_number']
+            best_pos = pos
+
+    best_page = pages[best_pos]['page_number'] if best_pos is not None else None
+    return _build_match(best_page, best_score, min_confidence)
+
+
+def _containment_candidates(
+    words: List[str],
+    page_index: Dict[str, List[int]],
+    page_count: int
+) -> Iterable[int]:
+    """List the page positions that can contain the whole search text.
+
+    Only the first and last words may match as fragments of longer page
+    words; every interior word is bounded by spaces and so must be a whole
+    page word. The rarest interior word's index entry therefore covers every
+    page that can contain the text, in page order.
+
+    Args:
+        words: Normalized search words
+        page_index: Index from build_page_index
+        page_count: Number of pages
+
+    Returns:
+        Page positions in ascending order
+    """
+    if len(words) < 3:
+        return range(page_count)
+    return min((page_index.get(word, ()) for word in words[1:-1]), key=len)
+
 
+def _score_upper_bound(matches: int, word_count: int) -> float:
+    """Bound the score _score_words can give a page from its word overlap.
+
+    Every interior word of a phrase contained in the page is a whole page
+    word, so the longest phrase is at most two words longer than the overlap.
+
+    Args:
+        matches: Number of search words found as whole words on the page
+        word_count: Total number of search words
+
+    Returns:
+        Upper bound on the similarity score
+    """
+    phrase_len = min(word_count, matches + 2)
+    return (matches / word_count) * OVERLAP_WEIGHT + (phrase_len / word_count) * PHRASE_WEIGHT
+
+
+def _build_match(page_number: Optional[int], score: float, min_confidence: float) -> Dict[str, Any]:
+    """Build a match result, dropping the page if below the threshold."""
     # Only return a page if confidence is above threshold
-    if best_score < min_confidence:
-        return {'page_number': None, 'confidence': best_score}
+    if score < min_confidence:
+        return {'page_number': None, 'confidence': score}
 
-    return {'page_number': best_page, 'confidence': best_score}
+    return {'page_number': page_number, 'confidence': score}
 
 
 def match_paragraphs_to_pdf(
@@ -181,6 +344,9 @@ def match_paragraphs_to_pdf(
 ) -> List[Dict[str, Any]]:
     """Match multiple paragraphs to PDF pages.
 
+    Books repeat short paragraphs such as headings and section breaks, so
+    each distinct text is matched once per call and its result reused.
+
     Args:
         paragraphs: List of paragraph dicts with 'id' and 'text' keys
         pdf_path: Path to the PDF file
@@ -192,16 +358,18 @@ def match_paragraphs_to_pdf(
         return []
 
     pages = extract_pdf_pages(pdf_path)
-    results = []
+    page_index = build_page_index(pages)
 
-    for para in paragraphs:
-        para_id = para.get('id')
-        para_text = para.get('text', '')
-
-        match_result = match_paragraph_to_page(para_text, pages)
+    matches = {
+        text: match_paragraph_to_page(text, pages, page_index=page_index)
+        for text in dict.fromkeys(para.get('text', '') for para in paragraphs)
+    }
 
+    results = []
+    for para in paragraphs:
+        match_result = matches[para.get('text', '')]
         results.append({
-            'paragraph_id': para_id,
+            'paragraph_id': para.get('id'),
             'page_number': match_result['page_number'],
             'confidence': match_result['confidence'],
         })
@@ -1,5 +1,6 @@
 """Quran reference detection service."""
 import re
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 
 from app.config import get_logger
@@ -282,11 +283,45 @@ MAX_AYAHS = {
 }
 
 
-def normalize_surah_name(name: str) -> Optional[int]:
+# Every detection pattern needs either a digit or a "sura"/"surah" keyword, so
+# text matching neither cannot contain a reference
+_QURAN_PREFILTER = re.compile(r'\d|sura', re.IGNORECASE)
+
+# Explicit Quran prefix (required), surah:ayah and optional ayah end - Quran 2:255-257
+_QURAN_PREFIX_RE = re.compile(
+    r"(?:Qur'?[aā]n|quran|Q\.)\s*,?\s*(\d{1,3})\s*:\s*(\d{1,3})(?:\s*[-–—]\s*(\d{1,3}))?",
+    re.IGNORECASE)
+
+# Parenthetical surah:ayah preceded by an Islamic context word - verse (2:255)
+_PAREN_RE = re.compile(
+    r'(?:verse|ayah|ayat|see|cf\.|compare|mentioned\s+in|stated\s+in|reference)\s*'
+    r'\(\s*(\d{1,3})\s*:\s*(\d{1,3})(?:\s*[-–—]\s*(\d{1,3}))?\s*\)',
+    re.IGNORECASE)
+
+# Surah name only - Surah Al-Baqarah
+_SURAH_ONLY_RE = re.compile(
+    r'(?:Surah?|Sura)\s+((?:Al-?|An-?|As-?|At-?|Ad-?|Az-?|Ar-?|Ash-?|Aal-?)?[A-Za-z\-]+)',
+    re.IGNORECASE)
+
+# Surah name with verse - Al-Baqarah: 255 or Al-Baqarah verse 255
+# A match starting mid-word fails whenever one at the word's first letter
+# does, so the lookbehind only skips attempts that would rescan the word.
+_NAME_VERSE_RE = re.compile(
+    r'(?<![A-Za-z\-])((?:Al-?|An-?|As-?|At-?|Ad-?|Az-?|Ar-?|Ash-?|Aal-?)?[A-Za-z\-]+)[\s:,]+(?:verse\s+)?(\d{1,3})(?:\s*[-–—]\s*(\d{1,3}))?',
+    re.IGNORECASE)
+
+# Article prefixes dropped by normalize_surah_name - "Al-Baqarah", "An-Nisa"
+_ARTICLE_PREFIX_RE = re.compile(r'^(al|an|as|at|ad|az|ar|ash|aal)-?')
+
+
+# The same surah names recur across a book, so cache the normalization
+@lru_cache(maxsize=4096)
+def normalize_surah_name(name: str, already_lower: bool = False) -> Optional[int]:
     """Normalize a surah name to its number.
 
     Args:
         name: Surah name in any format
+        already_lower: Skip lowercasing when the caller has already done it
 
     Returns:
         Surah number (1-114) or None if not found
@@ -295,13 +330,29 @@ def normalize_surah_name(name: str) -> Optional[int]:
         return None
 
     # Normalize: lowercase, remove al-/an-/as-/at-/ad-/az-/ar-/ash- prefix, remove hyphens
-    normalized = name.lower().strip()
-    normalized = re.sub(r'^(al|an|as|at|ad|az|ar|ash|aal)-?', '', normalized)
+    normalized = name.strip() if already_lower else name.lower().strip()
+    normalized = _ARTICLE_PREFIX_RE.sub('', normalized)
     normalized = normalized.replace('-', '').replace(' ', '')
 
     return SURAH_NAMES.get(normalized)
 
 
+def _surah_from_match(match: re.Match, text_lower: Optional[str]) -> Optional[int]:
+    """Resolve the surah name captured in group 1 of a match.
+
+    Args:
+        match: Regex match whose first group is a surah name
+        text_lower: Lowercased copy of the searched text, or None if its
+            offsets do not line up with the original
+
+    Returns:
+        Surah number (1-114) or None if not found
+    """
+    if text_lower is None:
+        return normalize_surah_name(match.group(1))
+    return normalize_surah_name(text_lower[match.start(1):match.end(1)], already_lower=True)
+
+
 def is_valid_reference(surah: int, ayah_start: int, ayah_end: Optional[int] = None) -> bool:
     """Check if a Quran reference is valid.
 
@@ -343,22 +394,19 @@ def detect_quran_refs(text: str) -> List[Dict[str, Any]]:
     Returns:
         List of reference dicts with surah, ayah_start, ayah_end, surah_name, raw_text
     """
-    if not text:
+    if not text or not _QURAN_PREFILTER.search(text):
         return []
 
     refs = []
     seen = set()  # Avoid duplicates
 
+    # Lowercase once; only reusable for slicing if offsets are unchanged
+    text_lower = text.lower()
+    if len(text_lower) != len(text):
+        text_lower = None
+
     # Pattern 1: Explicit Quran prefix - Quran/Qur'an/Q. 2:255 or 2:255-257
-    quran_prefix_pattern = r'''
-        (?:Qur[\'']?[aā]n|quran|Q\.)\s*,?\s*       # Quran prefix (required)
-        (\d{1,3})                                  # Surah number
-        \s*:\s*                                    # Colon separator
-        (\d{1,3})                                  # Ayah start
-        (?:\s*[-–—]\s*(\d{1,3}))?                  # Optional ayah end
-    '''
-
-    for match in re.finditer(quran_prefix_pattern, text, re.IGNORECASE | re.VERBOSE):
+    for match in _QURAN_PREFIX_RE.finditer(text):
         surah = int(match.group(1))
         ayah_start = int(match.group(2))
         ayah_end = int(match.group(3)) if match.group(3) else None
@@ -377,17 +425,7 @@ def detect_quran_refs(text: str) -> List[Dict[str, Any]]:
 
     # Pattern 1b: Parenthetical format only in Islamic context - (2:255)
     # Only match if preceded by Islamic context words
-    paren_pattern = r'''
-        (?:verse|ayah|ayat|see|cf\.|compare|mentioned\s+in|stated\s+in|reference)\s*
-        \(\s*
-        (\d{1,3})                                  # Surah number
-        \s*:\s*                                    # Colon separator
-        (\d{1,3})                                  # Ayah start
-        (?:\s*[-–—]\s*(\d{1,3}))?                  # Optional ayah end
-        \s*\)
-    '''
-
-    for match in re.finditer(paren_pattern, text, re.IGNORECASE | re.VERBOSE):
+    for match in _PAREN_RE.finditer(text):
         surah = int(match.group(1))
         ayah_start = int(match.group(2))
         ayah_end = int(match.group(3)) if match.group(3) else None
@@ -405,11 +443,8 @@ def detect_quran_refs(text: str) -> List[Dict[str, Any]]:
                 })
 
     # Pattern 2: Surah name only - Surah Al-Baqarah
-    surah_only_pattern = r'(?:Surah?|Sura)\s+((?:Al-?|An-?|As-?|At-?|Ad-?|Az-?|Ar-?|Ash-?|Aal-?)?[A-Za-z\-]+)'
-
-    for match in re.finditer(surah_only_pattern, text, re.IGNORECASE):
-        name = match.group(1)
-        surah = normalize_surah_name(name)
+    for match in _SURAH_ONLY_RE.finditer(text):
+        surah = _surah_from_match(match, text_lower)
         if surah:
             key = (surah, None, None)
             if key not in seen:
@@ -423,11 +458,8 @@ def detect_quran_refs(text: str) -> List[Dict[str, Any]]:
                 })
 
     # Pattern 3: Surah name with verse - Al-Baqarah: 255 or Al-Baqarah verse 255
-    name_verse_pattern = r'((?:Al-?|An-?|As-?|At-?|Ad-?|Az-?|Ar-?|Ash-?|Aal-?)?[A-Za-z\-]+)[\s:,]+(?:verse\s+)?(\d{1,3})(?:\s*[-–—]\s*(\d{1,3}))?'
-
-    for match in re.finditer(name_verse_pattern, text, re.IGNORECASE):
-        name = match.group(1)
-        surah = normalize_surah_name(name)
+    for match in _NAME_VERSE_RE.finditer(text):
+        surah = _surah_from_match(match, text_lower)
         if surah:
             ayah_start = int(match.group(2))
             ayah_end = int(match.group(3)) if match.group(3) else None
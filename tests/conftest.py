@@ -0,0 +1,243 @@
+"""Shared fixtures for the Annotation Tool v2 test suite."""
+import os
+import sqlite3
+import pytest
+from pathlib import Path
+
+from flask.globals import app_ctx
+from sqlalchemy import event, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+import app.models as models
+from app.models import db, Paragraph, User
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+# Set by pytest-xdist in each worker process; 'main' when running serially
+WORKER_ID = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+
+# Users seeded once for the whole session: (username, password, role)
+SEED_USERS = [
+    ('admin', 'adminpass', 'admin'),
+    ('annotator', 'userpass', 'annotator'),
+    ('testuser', 'testpass', 'annotator'),
+]
+
+# Seed password hashes are computed once at import with a single PBKDF2
+# iteration; check_password reads the method from the hash, so logging in
+# as a seeded user skips the slow default KDF as well
+SEED_PASSWORD_METHOD = 'pbkdf2:sha256:1'
+SEED_PASSWORD_HASHES = {
+    password: generate_password_hash(password, method=SEED_PASSWORD_METHOD)
+    for _, password, _ in SEED_USERS
+}
+
+
+# Durability settings that only cost time in tests; a crashed run discards
+# the database anyway. No-ops for the default in-memory database, they keep
+# a file-backed one (create_app(database_uri=...)) off the disk sync path.
+SQLITE_TEST_PRAGMAS = (
+    'PRAGMA synchronous=OFF',
+    'PRAGMA journal_mode=MEMORY',
+    'PRAGMA temp_store=MEMORY',
+)
+
+
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_test_pragmas(dbapi_connection, connection_record):
+    """Apply SQLITE_TEST_PRAGMAS to every SQLite connection opened in tests."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_TEST_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Create the test application with schema and users built once."""
+    app = create_app(testing=True)
+    with app.app_context():
+        engine = db.engine
+
+        # pysqlite defers BEGIN and would release the outer transaction on the
+        # first SAVEPOINT; take over transaction control so savepoints nest
+        @event.listens_for(engine, 'connect')
+        def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, 'begin')
+        def _emit_begin(connection):
+            connection.exec_driver_sql('BEGIN')
+
+        # The StaticPool connection already exists, so the connect hook missed it
+        with engine.connect() as connection:
+            connection.connection.dbapi_connection.isolation_level = None
+
+        db.create_all()
+        # One executemany INSERT instead of a unit-of-work flush per user
+        db.session.execute(insert(User), [
+            {'username': username, 'role': role, 'password_hash': SEED_PASSWORD_HASHES[password]}
+            for username, password, role in SEED_USERS
+        ])
+        db.session.commit()
+    yield app
+
+
+@pytest.fixture(scope='session')
+def user_ids(app):
+    """Map each seeded username to its primary key.
+
+    Seeded rows survive the per-test rollback, so the ids are stable.
+    """
+    with app.app_context():
+        return dict(db.session.execute(select(User.username, User.id)).all())
+
+
+@pytest.fixture(scope='session', autouse=True)
+def uploads_dir(tmp_path_factory):
+    """Save uploads under a per-worker temporary directory.
+
+    The testing database is in-memory and so already private to each xdist
+    worker; uploaded files are the only state written to disk.
+    """
+    import app.routes.dashboard as dashboard
+    path = tmp_path_factory.mktemp(f'uploads-{WORKER_ID}')
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(dashboard, 'UPLOADS_DIR', path)
+        yield path
+
+
+@pytest.fixture(scope='session', autouse=True)
+def fast_password_hashing():
+    """Hash passwords set during tests with SEED_PASSWORD_METHOD.
+
+    Users created by tests or through the admin routes would otherwise pay
+    for the default scrypt KDF on every set_password call.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(models, 'PASSWORD_HASH_METHOD', SEED_PASSWORD_METHOD)
+        yield
+
+
+@pytest.fixture(scope='session')
+def simple_docx_bytes():
+    """Contents of fixtures/simple.docx, read once per session."""
+    return (FIXTURES_DIR / 'simple.docx').read_bytes()
+
+
+@pytest.fixture(scope='session')
+def with_headings_docx_bytes():
+    """Contents of fixtures/with_headings.docx, read once per session."""
+    return (FIXTURES_DIR / 'with_headings.docx').read_bytes()
+
+
+@pytest.fixture(scope='session')
+def simple_pdf_bytes():
+    """Contents of fixtures/simple.pdf, read once per session."""
+    return (FIXTURES_DIR / 'simple.pdf').read_bytes()
+
+
+@pytest.fixture
+def db_session(app):
+    """Run the test inside a transaction that is rolled back afterwards.
+
+    The session joins an outer transaction on a dedicated connection, so
+    commits made by routes or tests only release a SAVEPOINT. Each app
+    context gets its own session, so instances need not be expired on commit.
+
+    Outside any app context the test body gets one session of its own, so
+    setup and verification can query without pushing a context. An app
+    context held open across requests would instead be reused by the test
+    client, sharing g and the session between requests.
+    """
+    with app.app_context():
+        connection = db.engine.connect()
+        transaction = connection.begin()
+
+    original_session = db.session
+    db.session = scoped_session(
+        sessionmaker(
+            bind=connection,
+            join_transaction_mode='create_savepoint',
+            expire_on_commit=False,
+        ),
+        scopefunc=lambda: id(app_ctx._get_current_object()) if app_ctx else None,
+    )
+
+    yield db.session
+
+    db.session.remove()
+    db.session = original_session
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def bulk_paragraphs(db_session):
+    """Return a helper that inserts n plain paragraphs into a chapter.
+
+    Rows go in with one executemany INSERT and a flush, skipping the
+    per-object unit-of-work cost; use it for fixtures needing many rows.
+    """
+    def insert_paragraphs(chapter, n):
+        db_session.execute(insert(Paragraph), [
+            {'chapter_id': chapter.id, 'text': f'p{i}', 'type': 'paragraph', 'order_index': i}
+            for i in range(n)
+        ])
+        db_session.flush()
+    return insert_paragraphs
+
+
+@pytest.fixture
+def client(app):
+    """Create test client."""
+    return app.test_client()
+
+
+def login_as(client, user_id):
+    """Log a test client in by writing the Flask-Login session keys directly.
+
+    Skips the login view and its password check; TestLogin covers that path.
+    """
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+
+@pytest.fixture
+def admin_client(client, user_ids):
+    """Create authenticated admin client."""
+    login_as(client, user_ids['admin'])
+    return client
+
+
+@pytest.fixture(scope='class')
+def admin_client_ro(app, user_ids):
+    """Create an admin client logged in once per test class.
+
+    Only for tests that do not change data; the session cookie stays valid
+    because seeded users survive the per-test rollback.
+    """
+    c = app.test_client()
+    login_as(c, user_ids['admin'])
+    return c
+
+
+@pytest.fixture
+def user_client(app, user_ids):
+    """Create authenticated annotator client, separate from client."""
+    c = app.test_client()
+    login_as(c, user_ids['annotator'])
+    return c
+
+
+@pytest.fixture
+def logged_in_client(client, user_ids):
+    """Create logged-in test client."""
+    login_as(client, user_ids['testuser'])
+    return client
@@ -1,32 +1,7 @@
 """Tests for authentication routes."""
 import pytest
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-
-@pytest.fixture
-def app():
-    """Create test Flask app."""
-    from app import create_app
-    app = create_app(testing=True)
-    with app.app_context():
-        from app.models import db, User
-        db.create_all()
-        # Create test user
-        user = User(username='testuser', role='annotator')
-        user.set_password('testpass')
-        db.session.add(user)
-        db.session.commit()
-        yield app
-        db.drop_all()
-
-
-@pytest.fixture
-def client(app):
-    """Create test client."""
-    return app.test_client()
+
+pytestmark = pytest.mark.usefixtures('db_session')
 
 
 class TestLoginPage:
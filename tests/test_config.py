@@ -1,11 +1,10 @@
 """Tests for config and logging setup."""
 import pytest
 import os
-import sys
 from pathlib import Path
 
-# Add app to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from app import create_app
+from app.models import db, User
 
 
 class TestConfig:
@@ -42,6 +41,52 @@ class TestConfig:
         assert 'sqlite' in DATABASE_URI
 
 
+class TestTestingDatabase:
+    """Test the database used by the testing configuration."""
+
+    def test_testing_app_uses_shared_in_memory_sqlite(self):
+        """Testing apps should share one in-memory SQLite connection."""
+        from sqlalchemy.pool import StaticPool
+        app = create_app(testing=True)
+        with app.app_context():
+            assert db.engine.url.database == ':memory:'
+            assert isinstance(db.engine.pool, StaticPool)
+
+    def test_in_memory_database_shared_across_threads(self):
+        """Other threads should see the same in-memory database."""
+        import threading
+        app = create_app(testing=True)
+        with app.app_context():
+            db.create_all()
+            db.session.add(User(username='threaded'))
+            db.session.commit()
+
+        counts = []
+
+        def count_users():
+            with app.app_context():
+                counts.append(User.query.filter_by(username='threaded').count())
+
+        thread = threading.Thread(target=count_users)
+        thread.start()
+        thread.join()
+        assert counts == [1]
+
+    def test_database_uri_override(self, tmp_path):
+        """An explicit database_uri should replace the default."""
+        uri = f"sqlite:///{tmp_path / 'override.db'}"
+        app = create_app(testing=True, database_uri=uri)
+        assert app.config['SQLALCHEMY_DATABASE_URI'] == uri
+
+    def test_file_database_skips_disk_sync(self, tmp_path):
+        """Test connections to a file database should not fsync or journal to disk."""
+        app = create_app(testing=True, database_uri=f"sqlite:///{tmp_path / 'pragmas.db'}")
+        with app.app_context():
+            with db.engine.connect() as connection:
+                assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == 0
+                assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'memory'
+
+
 class TestLogging:
     """Test logging setup."""
 
@@ -69,23 +114,43 @@ class TestLogging:
         logger.error("test_error", error_code=500)
 
 
+@pytest.fixture(scope='class')
+def dirs_created(tmp_path_factory):
+    """Run ensure_dirs once against a temporary data and log location."""
+    import app.config as config
+    root = tmp_path_factory.mktemp('dirs')
+    data_dir = root / 'data'
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(config, 'DATA_DIR', data_dir)
+        mp.setattr(config, 'LOG_DIR', root / 'logs')
+        mp.setattr(config, 'UPLOADS_DIR', data_dir / 'uploads')
+        mp.setattr(config, 'EXPORTS_DIR', data_dir / 'exports')
+        mp.setattr(config, 'BACKUPS_DIR', data_dir / 'backups')
+        config.ensure_dirs()
+        yield root
+
+
+@pytest.mark.usefixtures('dirs_created')
 class TestDirectories:
     """Test that required directories are created."""
 
     def test_data_dir_created(self):
         """DATA_DIR should be created if it doesn't exist."""
-        from app.config import DATA_DIR, ensure_dirs
-        ensure_dirs()
+        from app.config import DATA_DIR
         assert DATA_DIR.exists()
 
     def test_log_dir_created(self):
         """LOG_DIR should be created if it doesn't exist."""
-        from app.config import LOG_DIR, ensure_dirs
-        ensure_dirs()
+        from app.config import LOG_DIR
         assert LOG_DIR.exists()
 
     def test_uploads_dir_created(self):
         """uploads directory should be created."""
-        from app.config import DATA_DIR, ensure_dirs
-        ensure_dirs()
+        from app.config import DATA_DIR
         assert (DATA_DIR / 'uploads').exists()
+
+    def test_ensure_dirs_is_idempotent(self):
+        """Calling ensure_dirs again should not fail on existing directories."""
+        from app.config import BACKUPS_DIR, ensure_dirs
+        ensure_dirs()
+        assert BACKUPS_DIR.exists()
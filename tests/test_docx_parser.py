@@ -1,77 +1,88 @@
 """Tests for DOCX parser service."""
 import pytest
+from functools import lru_cache
 from pathlib import Path
 
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from app.services.docx_parser import parse_docx, detect_paragraph_type
+from app.services.docx_parser import parse_docx, parse_docx_from_bytes, detect_paragraph_type
 
 FIXTURES_DIR = Path(__file__).parent / 'fixtures'
 
 
+@pytest.fixture(scope='session')
+def parsed():
+    """Parse each fixture DOCX at most once per session.
+
+    The file is read once and parsed from memory. Tests share the returned
+    dict and must not modify it.
+    """
+    @lru_cache(maxsize=None)
+    def parse(name):
+        return parse_docx_from_bytes((FIXTURES_DIR / name).read_bytes(), source=name)
+    return parse
+
+
 class TestParseDocx:
     """Test DOCX parsing functionality."""
 
-    def test_parse_simple_docx(self):
+    def test_parse_simple_docx(self, parsed):
         """Parse simple DOCX with plain paragraphs."""
-        result = parse_docx(FIXTURES_DIR / 'simple.docx')
+        result = parsed('simple.docx')
         assert 'paragraphs' in result
         assert len(result['paragraphs']) == 10
         assert result['paragraphs'][0]['text'] != ''
 
-    def test_parse_returns_list(self):
+    def test_parse_returns_list(self, parsed):
         """Result should contain a list of paragraphs."""
-        result = parse_docx(FIXTURES_DIR / 'simple.docx')
+        result = parsed('simple.docx')
         assert isinstance(result['paragraphs'], list)
 
-    def test_paragraph_has_required_fields(self):
+    def test_paragraph_has_required_fields(self, parsed):
         """Each paragraph should have text, type, and order_index."""
-        result = parse_docx(FIXTURES_DIR / 'simple.docx')
+        result = parsed('simple.docx')
         para = result['paragraphs'][0]
         assert 'text' in para
         assert 'type' in para
         assert 'order_index' in para
 
-    def test_detect_headings(self):
+    def test_detect_headings(self, parsed):
         """Headings should be detected automatically."""
-        result = parse_docx(FIXTURES_DIR / 'with_headings.docx')
+        result = parsed('with_headings.docx')
         headings = [p for p in result['paragraphs'] if p['type'] == 'heading']
         assert len(headings) >= 1
 
-    def test_heading_levels_detected(self):
+    def test_heading_levels_detected(self, parsed):
         """Different heading levels should be detected."""
-        result = parse_docx(FIXTURES_DIR / 'with_headings.docx')
+        result = parsed('with_headings.docx')
         # Should have level 1, 2, and 3 headings
         levels = set(p.get('level', 0) for p in result['paragraphs'] if p['type'] == 'heading')
         assert 1 in levels
         assert 2 in levels or 3 in levels  # At least some hierarchy
 
-    def test_parse_empty_docx(self):
+    def test_parse_empty_docx(self, parsed):
         """Empty DOCX should return empty list."""
-        result = parse_docx(FIXTURES_DIR / 'empty.docx')
+        result = parsed('empty.docx')
         assert len(result['paragraphs']) == 0
 
-    def test_parse_complex_docx(self):
+    def test_parse_complex_docx(self, parsed):
         """Complex DOCX with many paragraphs should parse correctly."""
-        result = parse_docx(FIXTURES_DIR / 'complex.docx')
+        result = parsed('complex.docx')
         # Should have significant content
         assert len(result['paragraphs']) > 30
 
-    def test_order_index_sequential(self):
+    def test_order_index_sequential(self, parsed):
         """Order index should be sequential starting from 0."""
-        result = parse_docx(FIXTURES_DIR / 'simple.docx')
+        result = parsed('simple.docx')
         indices = [p['order_index'] for p in result['paragraphs']]
         assert indices == list(range(len(indices)))
 
-    def test_text_content_preserved(self):
+    def test_text_content_preserved(self, parsed):
         """Text content should be preserved accurately."""
-        result = parse_docx(FIXTURES_DIR / 'simple.docx')
+        result = parsed('simple.docx')
         assert 'paragraph' in result['paragraphs'][0]['text'].lower()
 
-    def test_quote_detection(self):
+    def test_quote_detection(self, parsed):
         """Quote style paragraphs should be detected."""
-        result = parse_docx(FIXTURES_DIR / 'with_quotes.docx')
+        result = parsed('with_quotes.docx')
         quotes = [p for p in result['paragraphs'] if p['type'] == 'quote']
         assert len(quotes) >= 1
 
@@ -79,35 +90,28 @@ class TestParseDocx:
 class TestDetectParagraphType:
     """Test paragraph type detection."""
 
-    @pytest.mark.parametrize("style_name,expected_type", [
-        ('Heading 1', 'heading'),
-        ('Heading 2', 'heading'),
-        ('Heading 3', 'heading'),
-        ('Title', 'heading'),
-        ('Normal', 'paragraph'),
-        ('Body Text', 'paragraph'),
-        ('Quote', 'quote'),
-        ('Intense Quote', 'quote'),
-        ('Block Text', 'quote'),
-        (None, 'paragraph'),
-        ('', 'paragraph'),
-    ])
-    def test_style_to_type_mapping(self, style_name, expected_type):
-        """Various styles should map to correct types."""
-        result = detect_paragraph_type(style_name)
-        assert result['type'] == expected_type
-
-    @pytest.mark.parametrize("style_name,expected_level", [
-        ('Heading 1', 1),
-        ('Heading 2', 2),
-        ('Heading 3', 3),
-        ('Title', 1),
-        ('Normal', 1),
-    ])
-    def test_heading_level_extraction(self, style_name, expected_level):
-        """Heading levels should be extracted correctly."""
-        result = detect_paragraph_type(style_name)
-        assert result.get('level', 1) == expected_level
+    # (style name, expected type, expected level or None if not checked)
+    STYLE_CASES = [
+        ('Heading 1', 'heading', 1),
+        ('Heading 2', 'heading', 2),
+        ('Heading 3', 'heading', 3),
+        ('Title', 'heading', 1),
+        ('Normal', 'paragraph', 1),
+        ('Body Text', 'paragraph', None),
+        ('Quote', 'quote', None),
+        ('Intense Quote', 'quote', None),
+        ('Block Text', 'quote', None),
+        (None, 'paragraph', None),
+        ('', 'paragraph', None),
+    ]
+
+    def test_style_mapping_table(self):
+        """Styles should map to the correct type and heading level."""
+        for style_name, expected_type, expected_level in self.STYLE_CASES:
+            result = detect_paragraph_type(style_name)
+            assert result['type'] == expected_type, style_name
+            if expected_level is not None:
+                assert result.get('level', 1) == expected_level, style_name
 
 
 class TestEdgeCases:
@@ -118,20 +122,25 @@ class TestEdgeCases:
         with pytest.raises(FileNotFoundError):
             parse_docx(FIXTURES_DIR / 'nonexistent.docx')
 
-    def test_invalid_file_raises(self):
+    def test_invalid_file_raises(self, tmp_path):
         """Invalid DOCX should raise appropriate error."""
-        # Create a fake file
-        fake_file = FIXTURES_DIR / 'fake.docx'
-        fake_file.write_text('not a docx file')
-        try:
-            with pytest.raises(Exception):  # Could be various exceptions
-                parse_docx(fake_file)
-        finally:
-            fake_file.unlink()
-
-    def test_whitespace_only_paragraphs_filtered(self):
+        fake_file = tmp_path / 'fake.docx'
+        fake_file.write_bytes(b'not a docx file')
+        with pytest.raises(Exception):  # Could be various exceptions
+            parse_docx(fake_file)
+
+    def test_invalid_bytes_raise_value_error(self):
+        """Non-DOCX bytes should raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_docx_from_bytes(b'not a docx file')
+
+    def test_path_and_bytes_agree(self, parsed):
+        """Parsing from a path should match parsing the same bytes."""
+        assert parse_docx(FIXTURES_DIR / 'simple.docx') == parsed('simple.docx')
+
+    def test_whitespace_only_paragraphs_filtered(self, parsed):
         """Paragraphs with only whitespace should be filtered out."""
-        result = parse_docx(FIXTURES_DIR / 'simple.docx')
+        result = parsed('simple.docx')
         for para in result['paragraphs']:
             assert para['text'].strip() != ''
 
@@ -139,22 +148,22 @@ class TestEdgeCases:
 class TestChapterDetection:
     """Test chapter structure detection."""
 
-    def test_chapters_detected(self):
+    def test_chapters_detected(self, parsed):
         """Chapter structure should be detected from headings."""
-        result = parse_docx(FIXTURES_DIR / 'with_headings.docx')
+        result = parsed('with_headings.docx')
         assert 'chapters' in result
         assert len(result['chapters']) >= 1
 
-    def test_chapter_has_title(self):
+    def test_chapter_has_title(self, parsed):
         """Each chapter should have a title."""
-        result = parse_docx(FIXTURES_DIR / 'with_headings.docx')
+        result = parsed('with_headings.docx')
         for chapter in result['chapters']:
             assert 'title' in chapter
             assert chapter['title'] != ''
 
-    def test_chapter_has_paragraphs(self):
+    def test_chapter_has_paragraphs(self, parsed):
         """Each chapter should list its paragraph indices."""
-        result = parse_docx(FIXTURES_DIR / 'with_headings.docx')
+        result = parsed('with_headings.docx')
         for chapter in result['chapters']:
             assert 'paragraph_indices' in chapter
             assert isinstance(chapter['paragraph_indices'], list)
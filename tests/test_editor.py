@@ -1,73 +1,35 @@
 """Tests for editor routes and functionality."""
 import pytest
 import io
-from pathlib import Path
+from sqlalchemy import insert, select
 
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from app.models import db, Book, Chapter, Paragraph, Group, Reference
 
-FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+pytestmark = pytest.mark.usefixtures('db_session')
 
 
 @pytest.fixture
-def app():
-    """Create test Flask app."""
-    from app import create_app
-    app = create_app(testing=True)
-    with app.app_context():
-        from app.models import db, User, Book, Chapter, Paragraph
-        db.create_all()
-        # Create test user
-        user = User(username='testuser', role='annotator')
-        user.set_password('testpass')
-        db.session.add(user)
-        db.session.commit()
-        yield app
-        db.drop_all()
-
-
-@pytest.fixture
-def client(app):
-    """Create test client."""
-    return app.test_client()
-
-
-@pytest.fixture
-def logged_in_client(client):
-    """Create logged-in test client."""
-    client.post('/login', data={
-        'username': 'testuser',
-        'password': 'testpass'
-    })
-    return client
-
-
-@pytest.fixture
-def book_with_paragraphs(app):
-    """Create a book with chapters and paragraphs."""
-    from app.models import db, Book, Chapter, Paragraph
-
-    with app.app_context():
-        book = Book(title='Test Book', slug='test-book', author='Test Author')
-        db.session.add(book)
-        db.session.commit()
-
-        chapter = Chapter(book_id=book.id, title='Chapter 1', order_index=0)
-        db.session.add(chapter)
-        db.session.commit()
-
-        for i in range(5):
-            para = Paragraph(
-                chapter_id=chapter.id,
-                text=f'Test paragraph {i+1} content.',
-                type='paragraph' if i > 0 else 'heading',
-                level=1,
-                order_index=i
-            )
-            db.session.add(para)
-        db.session.commit()
-
-        return book.slug
+def book_with_paragraphs(db_session):
+    """Create a book with a chapter and five paragraphs and return it."""
+    book = Book(title='Test Book', slug='test-book', author='Test Author')
+    chapter = Chapter(book=book, title='Chapter 1', order_index=0)
+    db.session.add_all([book, chapter])
+    db.session.flush()
+
+    # One executemany INSERT for the paragraphs
+    db.session.execute(insert(Paragraph), [
+        {
+            'chapter_id': chapter.id,
+            'text': f'Test paragraph {i+1} content.',
+            'type': 'paragraph' if i > 0 else 'heading',
+            'level': 1,
+            'order_index': i,
+        }
+        for i in range(5)
+    ])
+    db.session.commit()
+
+    return book
 
 
 class TestEditorView:
@@ -78,20 +40,20 @@ class TestEditorView:
         response = client.get('/editor/test-book')
         assert response.status_code in [302, 401]
 
-    def test_editor_renders_for_logged_in_user(self, logged_in_client, app, book_with_paragraphs):
+    def test_editor_renders_for_logged_in_user(self, logged_in_client, book_with_paragraphs):
         """Editor should render for authenticated users."""
-        response = logged_in_client.get(f'/editor/{book_with_paragraphs}')
+        response = logged_in_client.get(f'/editor/{book_with_paragraphs.slug}')
         assert response.status_code == 200
 
-    def test_editor_shows_book_title(self, logged_in_client, app, book_with_paragraphs):
+    def test_editor_shows_book_title(self, logged_in_client, book_with_paragraphs):
         """Editor should display the book title."""
-        response = logged_in_client.get(f'/editor/{book_with_paragraphs}')
+        response = logged_in_client.get(f'/editor/{book_with_paragraphs.slug}')
         assert response.status_code == 200
         assert b'Test Book' in response.data
 
-    def test_editor_shows_paragraphs(self, logged_in_client, app, book_with_paragraphs):
+    def test_editor_shows_paragraphs(self, logged_in_client, book_with_paragraphs):
         """Editor should display paragraphs."""
-        response = logged_in_client.get(f'/editor/{book_with_paragraphs}')
+        response = logged_in_client.get(f'/editor/{book_with_paragraphs.slug}')
         assert response.status_code == 200
         assert b'Test paragraph' in response.data
 
@@ -104,12 +66,9 @@ class TestEditorView:
 class TestParagraphTypeEdit:
     """Test paragraph type editing."""
 
-    def test_update_paragraph_type(self, logged_in_client, app, book_with_paragraphs):
+    def test_update_paragraph_type(self, logged_in_client, book_with_paragraphs):
         """Should be able to update paragraph type via HTMX."""
-        from app.models import Paragraph
-        with app.app_context():
-            para = Paragraph.query.first()
-            para_id = para.id
+        para_id = db.session.scalar(select(Paragraph.id))
 
         response = logged_in_client.post(
             f'/api/paragraph/{para_id}/type',
@@ -119,16 +78,12 @@ class TestParagraphTypeEdit:
         assert response.status_code == 200
 
         # Verify the change persisted
-        with app.app_context():
-            para = Paragraph.query.get(para_id)
-            assert para.type == 'quote'
+        para = db.session.get(Paragraph, para_id)
+        assert para.type == 'quote'
 
-    def test_update_paragraph_type_invalid(self, logged_in_client, app, book_with_paragraphs):
+    def test_update_paragraph_type_invalid(self, logged_in_client, book_with_paragraphs):
         """Invalid paragraph type should be rejected or handled."""
-        from app.models import Paragraph
-        with app.app_context():
-            para = Paragraph.query.first()
-            para_id = para.id
+        para_id = db.session.scalar(select(Paragraph.id))
 
         response = logged_in_client.post(
             f'/api/paragraph/{para_id}/type',
@@ -142,12 +97,9 @@ class TestParagraphTypeEdit:
 class TestParagraphTextEdit:
     """Test paragraph text editing."""
 
-    def test_update_paragraph_text(self, logged_in_client, app, book_with_paragraphs):
+    def test_update_paragraph_text(self, logged_in_client, book_with_paragraphs):
         """Should be able to update paragraph text."""
-        from app.models import Paragraph
-        with app.app_context():
-            para = Paragraph.query.first()
-            para_id = para.id
+        para_id = db.session.scalar(select(Paragraph.id))
 
         new_text = 'Updated paragraph content.'
         response = logged_in_client.post(
@@ -158,16 +110,12 @@ class TestParagraphTextEdit:
         assert response.status_code == 200
 
         # Verify the change persisted
-        with app.app_context():
-            para = Paragraph.query.get(para_id)
-            assert para.text == new_text
+        para = db.session.get(Paragraph, para_id)
+        assert para.text == new_text
 
-    def test_update_paragraph_text_empty_rejected(self, logged_in_client, app, book_with_paragraphs):
+    def test_update_paragraph_text_empty_rejected(self, logged_in_client, book_with_paragraphs):
         """Empty text should be rejected."""
-        from app.models import Paragraph
-        with app.app_context():
-            para = Paragraph.query.first()
-            para_id = para.id
+        para_id = db.session.scalar(select(Paragraph.id))
 
         response = logged_in_client.post(
             f'/api/paragraph/{para_id}/text',
@@ -180,17 +128,14 @@ class TestParagraphTextEdit:
 class TestBookUpload:
     """Test DOCX upload and parsing into book."""
 
-    def test_upload_docx_creates_book(self, logged_in_client, app):
+    def test_upload_docx_creates_book(self, logged_in_client, simple_docx_bytes):
         """Uploading DOCX should create a book with paragraphs."""
-        from app.models import Book, Paragraph
-
-        docx_path = FIXTURES_DIR / 'simple.docx'
-        with open(docx_path, 'rb') as f:
-            data = {
-                'file': (io.BytesIO(f.read()), 'simple.docx'),
-                'title': 'Simple Book',
-                'author': 'Test Author'
-            }
+
+        data = {
+            'file': (io.BytesIO(simple_docx_bytes), 'simple.docx'),
+            'title': 'Simple Book',
+            'author': 'Test Author'
+        }
 
         response = logged_in_client.post(
             '/books/upload',
@@ -201,24 +146,22 @@ class TestBookUpload:
         assert response.status_code == 200
 
         # Verify book was created
-        with app.app_context():
-            book = Book.query.filter_by(title='Simple Book').first()
-            assert book is not None
-            # Should have paragraphs
-            para_count = Paragraph.query.join(Paragraph.chapter).filter_by(book_id=book.id).count()
-            assert para_count > 0
-
-    def test_upload_docx_with_headings(self, logged_in_client, app):
+        book = Book.query.filter_by(title='Simple Book').first()
+        assert book is not None
+        # Should have paragraphs; EXISTS stops at the first matching row
+        has_paragraphs = db.session.scalar(select(
+            select(Paragraph.id).join(Paragraph.chapter).where(Chapter.book_id == book.id).exists()
+        ))
+        assert has_paragraphs
+
+    def test_upload_docx_with_headings(self, logged_in_client, with_headings_docx_bytes):
         """DOCX with headings should create chapters."""
-        from app.models import Book, Chapter
-
-        docx_path = FIXTURES_DIR / 'with_headings.docx'
-        with open(docx_path, 'rb') as f:
-            data = {
-                'file': (io.BytesIO(f.read()), 'with_headings.docx'),
-                'title': 'Book With Headings',
-                'author': 'Test Author'
-            }
+
+        data = {
+            'file': (io.BytesIO(with_headings_docx_bytes), 'with_headings.docx'),
+            'title': 'Book With Headings',
+            'author': 'Test Author'
+        }
 
         response = logged_in_client.post(
             '/books/upload',
@@ -229,48 +172,42 @@ class TestBookUpload:
         assert response.status_code == 200
 
         # Verify chapters were created
-        with app.app_context():
-            book = Book.query.filter_by(title='Book With Headings').first()
-            assert book is not None
-            chapter_count = Chapter.query.filter_by(book_id=book.id).count()
-            assert chapter_count >= 1
+        book = Book.query.filter_by(title='Book With Headings').first()
+        assert book is not None
+        chapter_count = Chapter.query.filter_by(book_id=book.id).count()
+        assert chapter_count >= 1
 
 
 class TestSaveBook:
     """Test book save functionality."""
 
-    def test_save_marks_book_updated(self, logged_in_client, app, book_with_paragraphs):
+    def test_save_marks_book_updated(self, logged_in_client, book_with_paragraphs):
         """Saving should update the book's updated_at timestamp."""
-        from app.models import Book
-        import time
+        from datetime import datetime
 
-        with app.app_context():
-            book = Book.query.filter_by(slug=book_with_paragraphs).first()
-            original_updated = book.updated_at
-
-        # Small delay to ensure timestamp changes
-        time.sleep(0.1)
+        # Backdate the book instead of sleeping until the clock moves on
+        original_updated = datetime(2000, 1, 1)
+        book = book_with_paragraphs
+        book.updated_at = original_updated
+        db.session.commit()
 
         response = logged_in_client.post(
-            f'/api/book/{book_with_paragraphs}/save',
+            f'/api/book/{book.slug}/save',
             headers={'HX-Request': 'true'}
         )
         assert response.status_code == 200
 
-        with app.app_context():
-            book = Book.query.filter_by(slug=book_with_paragraphs).first()
-            assert book.updated_at >= original_updated
+        # The save ran in the request's session; reload the row
+        db.session.refresh(book)
+        assert book.updated_at > original_updated
 
 
 class TestDeleteParagraph:
     """Test paragraph deletion (soft delete)."""
 
-    def test_delete_paragraph_soft(self, logged_in_client, app, book_with_paragraphs):
+    def test_delete_paragraph_soft(self, logged_in_client, book_with_paragraphs):
         """Deleting paragraph should soft-delete (set deleted=True)."""
-        from app.models import Paragraph
-        with app.app_context():
-            para = Paragraph.query.filter_by(deleted=False).first()
-            para_id = para.id
+        para_id = db.session.scalar(select(Paragraph.id).where(Paragraph.deleted.is_(False)))
 
         response = logged_in_client.delete(
             f'/api/paragraph/{para_id}',
@@ -279,20 +216,16 @@ class TestDeleteParagraph:
         assert response.status_code == 200
 
         # Verify soft-deleted
-        with app.app_context():
-            para = Paragraph.query.get(para_id)
-            assert para.deleted is True
+        para = db.session.get(Paragraph, para_id)
+        assert para.deleted is True
 
 
 class TestAddManualReference:
     """Test manual reference addition."""
 
-    def test_add_quran_reference(self, logged_in_client, app, book_with_paragraphs):
+    def test_add_quran_reference(self, logged_in_client, book_with_paragraphs):
         """Should be able to add a Quran reference manually."""
-        from app.models import Paragraph, Reference
-        with app.app_context():
-            para = Paragraph.query.first()
-            para_id = para.id
+        para_id = db.session.scalar(select(Paragraph.id))
 
         response = logged_in_client.post(
             f'/api/paragraph/{para_id}/reference',
@@ -306,20 +239,16 @@ class TestAddManualReference:
         )
         assert response.status_code == 200
 
-        with app.app_context():
-            ref = Reference.query.filter_by(paragraph_id=para_id, ref_type='quran').first()
-            assert ref is not None
-            assert ref.surah == 2
-            assert ref.ayah_start == 255
-            assert ref.verified is True
-            assert ref.auto_detected is False
+        ref = Reference.query.filter_by(paragraph_id=para_id, ref_type='quran').first()
+        assert ref is not None
+        assert ref.surah == 2
+        assert ref.ayah_start == 255
+        assert ref.verified is True
+        assert ref.auto_detected is False
 
-    def test_add_hadith_reference(self, logged_in_client, app, book_with_paragraphs):
+    def test_add_hadith_reference(self, logged_in_client, book_with_paragraphs):
         """Should be able to add a Hadith reference manually."""
-        from app.models import Paragraph, Reference
-        with app.app_context():
-            para = Paragraph.query.first()
-            para_id = para.id
+        para_id = db.session.scalar(select(Paragraph.id))
 
         response = logged_in_client.post(
             f'/api/paragraph/{para_id}/reference',
@@ -332,18 +261,14 @@ class TestAddManualReference:
         )
         assert response.status_code == 200
 
-        with app.app_context():
-            ref = Reference.query.filter_by(paragraph_id=para_id, ref_type='hadith').first()
-            assert ref is not None
-            assert ref.collection == 'bukhari'
-            assert ref.hadith_number == '1234'
+        ref = Reference.query.filter_by(paragraph_id=para_id, ref_type='hadith').first()
+        assert ref is not None
+        assert ref.collection == 'bukhari'
+        assert ref.hadith_number == '1234'
 
-    def test_add_footnote_reference(self, logged_in_client, app, book_with_paragraphs):
+    def test_add_footnote_reference(self, logged_in_client, book_with_paragraphs):
         """Should be able to add a footnote reference manually."""
-        from app.models import Paragraph, Reference
-        with app.app_context():
-            para = Paragraph.query.first()
-            para_id = para.id
+        para_id = db.session.scalar(select(Paragraph.id))
 
         response = logged_in_client.post(
             f'/api/paragraph/{para_id}/reference',
@@ -355,17 +280,13 @@ class TestAddManualReference:
         )
         assert response.status_code == 200
 
-        with app.app_context():
-            ref = Reference.query.filter_by(paragraph_id=para_id, ref_type='footnote').first()
-            assert ref is not None
-            assert 'footnote' in ref.raw_text
+        ref = Reference.query.filter_by(paragraph_id=para_id, ref_type='footnote').first()
+        assert ref is not None
+        assert 'footnote' in ref.raw_text
 
-    def test_add_reference_invalid_type(self, logged_in_client, app, book_with_paragraphs):
+    def test_add_reference_invalid_type(self, logged_in_client, book_with_paragraphs):
         """Invalid reference type should be rejected."""
-        from app.models import Paragraph
-        with app.app_context():
-            para = Paragraph.query.first()
-            para_id = para.id
+        para_id = db.session.scalar(select(Paragraph.id))
 
         response = logged_in_client.post(
             f'/api/paragraph/{para_id}/reference',
@@ -374,12 +295,9 @@ class TestAddManualReference:
         )
         assert response.status_code == 400
 
-    def test_add_quran_reference_missing_fields(self, logged_in_client, app, book_with_paragraphs):
+    def test_add_quran_reference_missing_fields(self, logged_in_client, book_with_paragraphs):
         """Quran reference without surah/ayah should be rejected."""
-        from app.models import Paragraph
-        with app.app_context():
-            para = Paragraph.query.first()
-            para_id = para.id
+        para_id = db.session.scalar(select(Paragraph.id))
 
         response = logged_in_client.post(
             f'/api/paragraph/{para_id}/reference',
@@ -393,46 +311,36 @@ class TestUpdateParagraphGroup:
     """Test paragraph group membership editing."""
 
     @pytest.fixture
-    def book_with_groups(self, app):
-        """Create a book with paragraphs and groups."""
-        from app.models import db, Book, Chapter, Paragraph, Group
-
-        with app.app_context():
-            book = Book(title='Test Book Groups', slug='test-book-groups', author='Test')
-            db.session.add(book)
-            db.session.commit()
-
-            chapter = Chapter(book_id=book.id, title='Chapter 1', order_index=0)
-            db.session.add(chapter)
-            db.session.commit()
-
-            # Create two groups
-            group1 = Group(book_id=book.id, order_index=0, token_count=100)
-            group2 = Group(book_id=book.id, order_index=1, token_count=100)
-            db.session.add(group1)
-            db.session.add(group2)
-            db.session.commit()
-
-            # Create paragraphs in group1
-            for i in range(3):
-                para = Paragraph(
-                    chapter_id=chapter.id,
-                    text=f'Paragraph {i+1}',
-                    type='paragraph',
-                    order_index=i,
-                    group_id=group1.id
-                )
-                db.session.add(para)
-            db.session.commit()
-
-            return {'slug': book.slug, 'group1_id': group1.id, 'group2_id': group2.id}
-
-    def test_move_paragraph_to_different_group(self, logged_in_client, app, book_with_groups):
+    def book_with_groups(self, db_session):
+        """Create a book with two groups and three paragraphs in the first."""
+        book = Book(title='Test Book Groups', slug='test-book-groups', author='Test')
+        chapter = Chapter(book=book, title='Chapter 1', order_index=0)
+
+        # Create two groups
+        group1 = Group(book=book, order_index=0, token_count=100)
+        group2 = Group(book=book, order_index=1, token_count=100)
+        db.session.add_all([book, chapter, group1, group2])
+        db.session.flush()
+
+        # Create paragraphs in group1
+        db.session.execute(insert(Paragraph), [
+            {
+                'chapter_id': chapter.id,
+                'text': f'Paragraph {i+1}',
+                'type': 'paragraph',
+                'order_index': i,
+                'group_id': group1.id,
+            }
+            for i in range(3)
+        ])
+        db.session.commit()
+
+        return {'slug': book.slug, 'group1_id': group1.id, 'group2_id': group2.id}
+
+    def test_move_paragraph_to_different_group(self, logged_in_client, book_with_groups):
         """Should be able to move a paragraph to a different group."""
-        from app.models import Paragraph
-        with app.app_context():
-            para = Paragraph.query.filter_by(group_id=book_with_groups['group1_id']).first()
-            para_id = para.id
+        para_id = db.session.scalar(
+            select(Paragraph.id).where(Paragraph.group_id == book_with_groups['group1_id']))
 
         response = logged_in_client.post(
             f'/api/paragraph/{para_id}/group',
@@ -441,16 +349,13 @@ class TestUpdateParagraphGroup:
         )
         assert response.status_code == 200
 
-        with app.app_context():
-            para = Paragraph.query.get(para_id)
-            assert para.group_id == book_with_groups['group2_id']
+        para = db.session.get(Paragraph, para_id)
+        assert para.group_id == book_with_groups['group2_id']
 
-    def test_remove_paragraph_from_group(self, logged_in_client, app, book_with_groups):
+    def test_remove_paragraph_from_group(self, logged_in_client, book_with_groups):
         """Should be able to remove a paragraph from its group."""
-        from app.models import Paragraph
-        with app.app_context():
-            para = Paragraph.query.filter_by(group_id=book_with_groups['group1_id']).first()
-            para_id = para.id
+        para_id = db.session.scalar(
+            select(Paragraph.id).where(Paragraph.group_id == book_with_groups['group1_id']))
 
         response = logged_in_client.post(
             f'/api/paragraph/{para_id}/group',
@@ -459,16 +364,13 @@ class TestUpdateParagraphGroup:
         )
         assert response.status_code == 200
 
-        with app.app_context():
-            para = Paragraph.query.get(para_id)
-            assert para.group_id is None
+        para = db.session.get(Paragraph, para_id)
+        assert para.group_id is None
 
-    def test_move_to_nonexistent_group(self, logged_in_client, app, book_with_groups):
+    def test_move_to_nonexistent_group(self, logged_in_client, book_with_groups):
         """Moving to nonexistent group should return 404."""
-        from app.models import Paragraph
-        with app.app_context():
-            para = Paragraph.query.filter_by(group_id=book_with_groups['group1_id']).first()
-            para_id = para.id
+        para_id = db.session.scalar(
+            select(Paragraph.id).where(Paragraph.group_id == book_with_groups['group1_id']))
 
         response = logged_in_client.post(
             f'/api/paragraph/{para_id}/group',
@@ -477,12 +379,10 @@ class TestUpdateParagraphGroup:
         )
         assert response.status_code == 404
 
-    def test_invalid_group_id(self, logged_in_client, app, book_with_groups):
+    def test_invalid_group_id(self, logged_in_client, book_with_groups):
         """Invalid group ID should return 400."""
-        from app.models import Paragraph
-        with app.app_context():
-            para = Paragraph.query.filter_by(group_id=book_with_groups['group1_id']).first()
-            para_id = para.id
+        para_id = db.session.scalar(
+            select(Paragraph.id).where(Paragraph.group_id == book_with_groups['group1_id']))
 
         response = logged_in_client.post(
             f'/api/paragraph/{para_id}/group',
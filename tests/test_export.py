@@ -1,20 +1,64 @@
 """Tests for export service."""
 import pytest
+import gzip
 import json
-from pathlib import Path
 from datetime import datetime
+from io import BytesIO
 
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import orjson
 
 from app.services.exporter import (
     export_book_json,
+    export_book_json_to_file,
     export_lightrag_json,
+    export_lightrag_json_stream,
+    export_lightrag_ndjson,
     build_paragraph_export,
     build_group_export,
     validate_export_data,
 )
 
+# Stand-in for database timestamps in input that the export should drop
+FIXED_TIME = datetime(2024, 1, 1)
+
+
+@pytest.fixture(scope='module')
+def two_group_book_data():
+    """A four-paragraph book in two groups, built once for the module.
+
+    Tests share it and must not modify it.
+    """
+    paragraphs = [
+        {'id': i, 'text': f'Para {i}', 'order_index': i, 'token_count': 300, 'group_id': i // 2}
+        for i in range(4)
+    ]
+    groups = [
+        {'order_index': g, 'token_count': 600, 'paragraphs': [
+            {'id': i, 'text': f'Para {i}'} for i in range(g*2, (g+1)*2)
+        ]}
+        for g in range(2)
+    ]
+    return {'title': 'Test', 'slug': 'test', 'paragraphs': paragraphs, 'groups': groups}
+
+
+@pytest.fixture(scope='module')
+def large_book_data():
+    """A 100-paragraph book in ten groups, built once for the module.
+
+    Tests share it and must not modify it.
+    """
+    paragraphs = [
+        {'id': i, 'text': f'Paragraph {i}', 'order_index': i, 'token_count': 50, 'group_id': i // 10}
+        for i in range(100)
+    ]
+    groups = [
+        {'order_index': g, 'token_count': 500, 'paragraphs': [
+            {'id': i, 'text': f'Paragraph {i}'} for i in range(g*10, (g+1)*10)
+        ]}
+        for g in range(10)
+    ]
+    return {'title': 'Large Book', 'slug': 'large', 'paragraphs': paragraphs, 'groups': groups}
+
 
 class TestBuildParagraphExport:
     """Test paragraph export building."""
@@ -46,7 +90,7 @@ class TestBuildParagraphExport:
             },
             ['id', 'text', 'order_index', 'chapter_title', 'page_number', 'is_heading', 'heading_level', 'quran_refs', 'hadith_refs']
         ),
-    ])
+    ], ids=['minimal', 'chapter', 'page_number', 'full'])
     def test_paragraph_export_has_keys(self, para, expected_keys):
         """Exported paragraph should have expected keys."""
         result = build_paragraph_export(para)
@@ -64,8 +108,8 @@ class TestBuildParagraphExport:
         para = {
             'id': 1, 'text': 'Content', 'order_index': 0,
             '_sa_instance_state': 'internal',
-            'created_at': datetime.now(),
-            'updated_at': datetime.now(),
+            'created_at': FIXED_TIME,
+            'updated_at': FIXED_TIME,
         }
         result = build_paragraph_export(para)
         assert '_sa_instance_state' not in result
@@ -94,7 +138,7 @@ class TestBuildGroupExport:
             },
             ['order_index', 'token_count', 'paragraph_ids']
         ),
-    ])
+    ], ids=['minimal', 'with_paragraphs'])
     def test_group_export_has_keys(self, group, expected_keys):
         """Exported group should have expected keys."""
         result = build_group_export(group)
@@ -120,7 +164,7 @@ class TestBuildGroupExport:
 class TestExportBookJson:
     """Test Book JSON export format."""
 
-    @pytest.fixture
+    @pytest.fixture(scope='class')
     def sample_book_data(self):
         """Sample book data for testing."""
         return {
@@ -139,40 +183,37 @@ class TestExportBookJson:
             ]
         }
 
-    def test_book_json_has_metadata(self, sample_book_data):
+    @pytest.fixture(scope='class')
+    def book_json(self, sample_book_data):
+        """sample_book_data exported and parsed once for the class.
+
+        Tests share the parsed dict and must not modify it.
+        """
+        return orjson.loads(export_book_json(sample_book_data))
+
+    def test_book_json_has_metadata(self, book_json):
         """Book JSON should include metadata."""
-        result = export_book_json(sample_book_data)
-        data = json.loads(result)
-        assert data['title'] == 'The Way of Peace'
-        assert data['author'] == 'Maulana Wahiduddin Khan'
-        assert data['slug'] == 'the-way-of-peace'
+        assert book_json['title'] == 'The Way of Peace'
+        assert book_json['author'] == 'Maulana Wahiduddin Khan'
+        assert book_json['slug'] == 'the-way-of-peace'
 
-    def test_book_json_has_paragraphs(self, sample_book_data):
+    def test_book_json_has_paragraphs(self, book_json):
         """Book JSON should include paragraphs."""
-        result = export_book_json(sample_book_data)
-        data = json.loads(result)
-        assert 'paragraphs' in data
-        assert len(data['paragraphs']) == 3
+        assert 'paragraphs' in book_json
+        assert len(book_json['paragraphs']) == 3
 
-    def test_book_json_has_groups(self, sample_book_data):
+    def test_book_json_has_groups(self, book_json):
         """Book JSON should include groups."""
-        result = export_book_json(sample_book_data)
-        data = json.loads(result)
-        assert 'groups' in data
-        assert len(data['groups']) == 1
+        assert 'groups' in book_json
+        assert len(book_json['groups']) == 1
 
-    def test_book_json_has_export_timestamp(self, sample_book_data):
+    def test_book_json_has_export_timestamp(self, book_json):
         """Book JSON should include export timestamp."""
-        result = export_book_json(sample_book_data)
-        data = json.loads(result)
-        assert 'exported_at' in data
+        assert 'exported_at' in book_json
 
-    def test_book_json_valid_format(self, sample_book_data):
+    def test_book_json_valid_format(self, book_json):
         """Book JSON should be valid JSON."""
-        result = export_book_json(sample_book_data)
-        # Should not raise
-        data = json.loads(result)
-        assert isinstance(data, dict)
+        assert isinstance(book_json, dict)
 
     def test_book_json_with_chapters(self):
         """Book JSON should include chapter information."""
@@ -185,7 +226,7 @@ class TestExportBookJson:
             'groups': []
         }
         result = export_book_json(data)
-        parsed = json.loads(result)
+        parsed = orjson.loads(result)
         assert parsed['paragraphs'][0]['chapter_title'] == 'Introduction'
 
     def test_book_json_with_references(self):
@@ -201,14 +242,26 @@ class TestExportBookJson:
             'groups': []
         }
         result = export_book_json(data)
-        parsed = json.loads(result)
+        parsed = orjson.loads(result)
         assert len(parsed['paragraphs'][0]['quran_refs']) == 1
 
+    @pytest.mark.parametrize("filename", ['book.json', 'book.json.gz'])
+    def test_book_json_to_file(self, tmp_path, sample_book_data, filename):
+        """File export should hold the same JSON, gzipped for .gz names."""
+        path = export_book_json_to_file(sample_book_data, tmp_path / filename)
+        opener = gzip.open if filename.endswith('.gz') else open
+        with opener(path, 'rb') as fp:
+            written = orjson.loads(fp.read())
+        expected = orjson.loads(export_book_json(sample_book_data))
+        written.pop('exported_at')
+        expected.pop('exported_at')
+        assert written == expected
+
 
 class TestExportLightragJson:
     """Test LightRAG JSON export format."""
 
-    @pytest.fixture
+    @pytest.fixture(scope='class')
     def sample_lightrag_data(self):
         """Sample data for LightRAG export."""
         return {
@@ -232,81 +285,91 @@ class TestExportLightragJson:
             ]
         }
 
-    def test_lightrag_returns_list(self, sample_lightrag_data):
+    @pytest.fixture(scope='class')
+    def lightrag_chunks(self, sample_lightrag_data):
+        """sample_lightrag_data exported and parsed once for the class.
+
+        Tests share the parsed list and must not modify it.
+        """
+        return orjson.loads(export_lightrag_json(sample_lightrag_data))
+
+    def test_lightrag_returns_list(self, lightrag_chunks):
         """LightRAG export should return a list of chunks."""
-        result = export_lightrag_json(sample_lightrag_data)
-        data = json.loads(result)
-        assert isinstance(data, list)
+        assert isinstance(lightrag_chunks, list)
 
-    def test_lightrag_chunk_has_content(self, sample_lightrag_data):
+    def test_lightrag_chunk_has_content(self, lightrag_chunks):
         """Each LightRAG chunk should have content field."""
-        result = export_lightrag_json(sample_lightrag_data)
-        data = json.loads(result)
-        for chunk in data:
+        for chunk in lightrag_chunks:
             assert 'content' in chunk
             assert len(chunk['content']) > 0
 
-    def test_lightrag_chunk_has_metadata(self, sample_lightrag_data):
+    def test_lightrag_chunk_has_metadata(self, lightrag_chunks):
         """Each LightRAG chunk should have metadata."""
-        result = export_lightrag_json(sample_lightrag_data)
-        data = json.loads(result)
-        for chunk in data:
+        for chunk in lightrag_chunks:
             assert 'metadata' in chunk
             assert 'source' in chunk['metadata']
 
-    def test_lightrag_combines_group_paragraphs(self, sample_lightrag_data):
+    def test_lightrag_combines_group_paragraphs(self, lightrag_chunks):
         """LightRAG should combine paragraphs in a group."""
-        result = export_lightrag_json(sample_lightrag_data)
-        data = json.loads(result)
         # One group = one chunk
-        assert len(data) == 1
+        assert len(lightrag_chunks) == 1
         # Content should include all paragraphs
-        assert 'First paragraph' in data[0]['content']
-        assert 'Second paragraph' in data[0]['content']
-        assert 'Third paragraph' in data[0]['content']
+        assert 'First paragraph' in lightrag_chunks[0]['content']
+        assert 'Second paragraph' in lightrag_chunks[0]['content']
+        assert 'Third paragraph' in lightrag_chunks[0]['content']
 
-    def test_lightrag_metadata_includes_book_info(self, sample_lightrag_data):
+    def test_lightrag_metadata_includes_book_info(self, lightrag_chunks):
         """LightRAG metadata should include book info."""
-        result = export_lightrag_json(sample_lightrag_data)
-        data = json.loads(result)
-        metadata = data[0]['metadata']
+        metadata = lightrag_chunks[0]['metadata']
         assert metadata['source'] == 'the-way-of-peace'
         assert metadata['title'] == 'The Way of Peace'
         assert metadata['author'] == 'Maulana Wahiduddin Khan'
 
-    def test_lightrag_metadata_includes_chunk_info(self, sample_lightrag_data):
+    def test_lightrag_metadata_includes_chunk_info(self, lightrag_chunks):
         """LightRAG metadata should include chunk position info."""
-        result = export_lightrag_json(sample_lightrag_data)
-        data = json.loads(result)
-        metadata = data[0]['metadata']
+        metadata = lightrag_chunks[0]['metadata']
         assert 'chunk_index' in metadata
         assert 'token_count' in metadata
 
-    def test_lightrag_multiple_groups(self):
+    def test_lightrag_multiple_groups(self, two_group_book_data):
         """LightRAG should create one chunk per group."""
+        result = export_lightrag_json(two_group_book_data)
+        parsed = orjson.loads(result)
+        assert len(parsed) == 2
+
+    def test_lightrag_includes_paragraph_ids(self, lightrag_chunks):
+        """LightRAG metadata should include paragraph IDs for traceability."""
+        metadata = lightrag_chunks[0]['metadata']
+        assert 'paragraph_ids' in metadata
+        assert metadata['paragraph_ids'] == [1, 2, 3]
+
+    @pytest.mark.parametrize("groups", [0, 1, 3])
+    def test_lightrag_stream_matches_string(self, groups):
+        """Streaming export should write exactly the string export's JSON."""
         data = {
             'title': 'Test',
             'slug': 'test',
-            'paragraphs': [
-                {'id': i, 'text': f'Para {i}', 'order_index': i, 'token_count': 300, 'group_id': i // 2}
-                for i in range(4)
-            ],
             'groups': [
-                {'order_index': 0, 'token_count': 600, 'paragraphs': [{'id': 0, 'text': 'Para 0'}, {'id': 1, 'text': 'Para 1'}]},
-                {'order_index': 1, 'token_count': 600, 'paragraphs': [{'id': 2, 'text': 'Para 2'}, {'id': 3, 'text': 'Para 3'}]},
+                {'order_index': g, 'token_count': 100, 'paragraphs': [
+                    {'id': g, 'text': f'Para {g}\nline two', 'chapter_title': 'Ch', 'page_number': g + 1}
+                ]}
+                for g in range(groups)
             ]
         }
-        result = export_lightrag_json(data)
-        parsed = json.loads(result)
-        assert len(parsed) == 2
-
-    def test_lightrag_includes_paragraph_ids(self, sample_lightrag_data):
-        """LightRAG metadata should include paragraph IDs for traceability."""
-        result = export_lightrag_json(sample_lightrag_data)
-        data = json.loads(result)
-        metadata = data[0]['metadata']
-        assert 'paragraph_ids' in metadata
-        assert metadata['paragraph_ids'] == [1, 2, 3]
+        buffer = BytesIO()
+        assert export_lightrag_json_stream(data, buffer) == groups
+        expected = json.dumps(
+            json.loads(export_lightrag_json(data)), ensure_ascii=False, indent=2
+        )
+        assert buffer.getvalue().decode('utf-8') == expected
+
+    def test_lightrag_ndjson_matches_json(self, large_book_data):
+        """Each NDJSON line should be the matching chunk of the JSON export."""
+        result = export_lightrag_ndjson(large_book_data)
+        assert result.endswith(b'\n')
+        lines = result.split(b'\n')[:-1]
+        expected = orjson.loads(export_lightrag_json(large_book_data))
+        assert [orjson.loads(line) for line in lines] == expected
 
 
 class TestValidateExportData:
@@ -359,14 +422,14 @@ class TestEdgeCases:
         """Book with no paragraphs should export."""
         data = {'title': 'Empty Book', 'paragraphs': [], 'groups': []}
         result = export_book_json(data)
-        parsed = json.loads(result)
+        parsed = orjson.loads(result)
         assert parsed['paragraphs'] == []
 
     def test_empty_paragraphs_lightrag(self):
         """Book with no paragraphs should export empty list."""
         data = {'title': 'Empty Book', 'slug': 'empty', 'paragraphs': [], 'groups': []}
         result = export_lightrag_json(data)
-        parsed = json.loads(result)
+        parsed = orjson.loads(result)
         assert parsed == []
 
     def test_unicode_content(self):
@@ -385,9 +448,24 @@ class TestEdgeCases:
             ]
         }
         result = export_book_json(data)
-        parsed = json.loads(result)
+        parsed = orjson.loads(result)
         assert 'بسم الله' in parsed['paragraphs'][0]['text']
 
+    def test_lightrag_output_formatting(self):
+        """Output should be two-space indented with unescaped Unicode."""
+        data = {
+            'title': 'القرآن',
+            'slug': 'quran',
+            'groups': [
+                {'order_index': 0, 'token_count': 10, 'paragraphs': [
+                    {'id': 1, 'text': 'بسم الله', 'page_number': 3}
+                ]}
+            ]
+        }
+        result = export_lightrag_json(data)
+        assert result == json.dumps(json.loads(result), ensure_ascii=False, indent=2)
+        assert 'بسم الله' in result
+
     def test_special_characters_in_text(self):
         """Special characters should be properly escaped."""
         data = {
@@ -404,24 +482,13 @@ class TestEdgeCases:
         }
         result = export_book_json(data)
         # Should be valid JSON
-        parsed = json.loads(result)
+        parsed = orjson.loads(result)
         assert '"Hello"' in parsed['paragraphs'][0]['text']
 
-    def test_large_paragraph_count(self):
+    def test_large_paragraph_count(self, large_book_data):
         """Export should handle many paragraphs."""
-        paragraphs = [
-            {'id': i, 'text': f'Paragraph {i}', 'order_index': i, 'token_count': 50, 'group_id': i // 10}
-            for i in range(100)
-        ]
-        groups = [
-            {'order_index': g, 'token_count': 500, 'paragraphs': [
-                {'id': i, 'text': f'Paragraph {i}'} for i in range(g*10, (g+1)*10)
-            ]}
-            for g in range(10)
-        ]
-        data = {'title': 'Large Book', 'slug': 'large', 'paragraphs': paragraphs, 'groups': groups}
-        result = export_book_json(data)
-        parsed = json.loads(result)
+        result = export_book_json(large_book_data)
+        parsed = orjson.loads(result)
         assert len(parsed['paragraphs']) == 100
 
     def test_newlines_in_text(self):
@@ -439,6 +506,6 @@ class TestEdgeCases:
             ]
         }
         result = export_book_json(data)
-        parsed = json.loads(result)
+        parsed = orjson.loads(result)
         assert '\n' in parsed['paragraphs'][0]['text']
 
@@ -1,9 +1,5 @@
 """Tests for footnote linking service."""
 import pytest
-from pathlib import Path
-
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.services.footnote_linker import (
     detect_footnote_markers,
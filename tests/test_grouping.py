@@ -1,9 +1,5 @@
 """Tests for paragraph grouping service."""
 import pytest
-from pathlib import Path
-
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.services.grouping import (
     count_tokens,
@@ -45,49 +41,62 @@ class TestCountTokens:
         assert count > 0
 
 
+@pytest.fixture(scope='module')
+def preset_paragraphs():
+    """Named paragraph lists shared by the grouping tests, built once.
+
+    create_groups only adds token_count when it is missing, so lists that
+    already carry it are not modified and can be shared between tests.
+    """
+    return {
+        f'{tokens}x{count}': [
+            {'id': i, 'text': f'para {i}', 'token_count': tokens}
+            for i in range(count)
+        ]
+        for tokens, count in ((100, 10), (200, 10), (100, 15))
+    }
+
+
 class TestCreateGroups:
     """Test group creation logic."""
 
     @pytest.mark.parametrize("token_counts,min_tokens,max_tokens,expected_groups", [
         # All fit in one group
-        ([100, 100, 100], 512, 800, 1),
-        ([200, 200], 512, 800, 1),
+        pytest.param([100, 100, 100], 512, 800, 1, id='fit-100x3'),
+        pytest.param([200, 200], 512, 800, 1, id='fit-200x2'),
 
         # Need to split
-        ([400, 400, 400], 512, 800, 2),
-        ([300, 300, 300, 300], 512, 800, 2),
+        pytest.param([400, 400, 400], 512, 800, 2, id='split-400x3'),
+        pytest.param([300, 300, 300, 300], 512, 800, 2, id='split-300x4'),
 
         # Edge: exactly at boundary
-        ([512], 512, 800, 1),
-        ([800], 512, 800, 1),
+        pytest.param([512], 512, 800, 1, id='at-min'),
+        pytest.param([800], 512, 800, 1, id='at-max'),
 
         # Single large paragraph over max
-        ([900], 512, 800, 1),  # Single para stays alone
+        pytest.param([900], 512, 800, 1, id='over-max'),  # Single para stays alone
 
         # Empty list
-        ([], 512, 800, 0),
+        pytest.param([], 512, 800, 0, id='empty'),
 
         # Many small paragraphs
-        ([50] * 20, 512, 800, 2),  # 1000 tokens total, ~2 groups
+        pytest.param([50] * 20, 512, 800, 2, id='many-small-50x20'),  # 1000 tokens total, ~2 groups
 
         # Mix of sizes
-        ([100, 500, 100, 600, 100], 512, 800, 3),
+        pytest.param([100, 500, 100, 600, 100], 512, 800, 3, id='mixed'),
     ])
     def test_group_count(self, token_counts, min_tokens, max_tokens, expected_groups):
         """Group count should match expected."""
         paragraphs = [
-            {'id': i, 'text': 'x' * tc, 'token_count': tc}
+            {'id': i, 'text': '', 'token_count': tc}
             for i, tc in enumerate(token_counts)
         ]
         groups = create_groups(paragraphs, min_tokens, max_tokens)
         assert len(groups) == expected_groups
 
-    def test_groups_respect_max_tokens(self):
+    def test_groups_respect_max_tokens(self, preset_paragraphs):
         """No group should exceed max tokens (unless single large para)."""
-        paragraphs = [
-            {'id': i, 'text': 'word ' * 100, 'token_count': 100}
-            for i in range(10)
-        ]
+        paragraphs = preset_paragraphs['100x10']
         groups = create_groups(paragraphs, min_tokens=512, max_tokens=800)
 
         for group in groups:
@@ -95,12 +104,9 @@ class TestCreateGroups:
             # Either under max or single paragraph
             assert total <= 800 or len(group['paragraphs']) == 1
 
-    def test_groups_aim_for_min_tokens(self):
+    def test_groups_aim_for_min_tokens(self, preset_paragraphs):
         """Groups should generally reach min token threshold."""
-        paragraphs = [
-            {'id': i, 'text': 'word ' * 200, 'token_count': 200}
-            for i in range(10)
-        ]
+        paragraphs = preset_paragraphs['200x10']
         groups = create_groups(paragraphs, min_tokens=512, max_tokens=800)
 
         # Most groups should reach min (except possibly last one)
@@ -108,25 +114,19 @@ class TestCreateGroups:
             total = sum(p['token_count'] for p in group['paragraphs'])
             assert total >= 512
 
-    def test_paragraph_order_preserved(self):
+    def test_paragraph_order_preserved(self, preset_paragraphs):
         """Paragraph order should be preserved within groups."""
-        paragraphs = [
-            {'id': i, 'text': f'para {i}', 'token_count': 100}
-            for i in range(10)
-        ]
+        paragraphs = preset_paragraphs['100x10']
         groups = create_groups(paragraphs, min_tokens=300, max_tokens=500)
 
         # Check order within each group
         for group in groups:
             ids = [p['id'] for p in group['paragraphs']]
-            assert ids == sorted(ids)
+            assert all(a < b for a, b in zip(ids, ids[1:]))
 
-    def test_all_paragraphs_assigned(self):
+    def test_all_paragraphs_assigned(self, preset_paragraphs):
         """All paragraphs should be assigned to a group."""
-        paragraphs = [
-            {'id': i, 'text': f'para {i}', 'token_count': 100}
-            for i in range(15)
-        ]
+        paragraphs = preset_paragraphs['100x15']
         groups = create_groups(paragraphs, min_tokens=512, max_tokens=800)
 
         assigned_ids = set()
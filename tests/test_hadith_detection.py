@@ -1,9 +1,5 @@
 """Tests for Hadith reference detection."""
 import pytest
-from pathlib import Path
-
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.services.hadith_detector import detect_hadith_refs, normalize_collection_name, COLLECTION_NAMES
 
@@ -1,338 +1,244 @@
 """Tests for database models."""
 import pytest
-import sys
-from pathlib import Path
 from datetime import datetime
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from app.models import db, User, Book, Chapter, Paragraph, Group, Reference, Version
+
+pytestmark = pytest.mark.usefixtures('db_session')
 
 
 @pytest.fixture
-def app():
-    """Create test Flask app with in-memory database."""
-    from app import create_app
-    app = create_app(testing=True)
-    with app.app_context():
-        from app.models import db
-        db.create_all()
-        yield app
-        db.drop_all()
+def book(db_session):
+    """Create a book; flushed so it has an id, not committed."""
+    book = Book(title='Test', slug='test')
+    db_session.add(book)
+    db_session.flush()
+    return book
 
 
 @pytest.fixture
-def db_session(app):
-    """Get database session."""
-    from app.models import db
-    with app.app_context():
-        yield db.session
+def chapter(db_session, book):
+    """Create a chapter in book; flushed so it has an id, not committed."""
+    chapter = Chapter(book_id=book.id, title='Ch1', order_index=1)
+    db_session.add(chapter)
+    db_session.flush()
+    return chapter
 
 
 class TestUserModel:
     """Test User model."""
 
-    def test_create_user(self, app):
-        """Can create a user."""
-        from app.models import db, User
-        with app.app_context():
-            user = User(username='testuser', role='admin')
-            user.set_password('testpass123')
-            db.session.add(user)
-            db.session.commit()
-
-            assert user.id is not None
-            assert user.username == 'testuser'
-            assert user.role == 'admin'
-
-    def test_password_hashing(self, app):
+    @pytest.mark.parametrize("kwargs,expected", [
+        pytest.param({'username': 'modeluser', 'role': 'admin'},
+                     {'username': 'modeluser', 'role': 'admin'}, id='create'),
+        pytest.param({'username': 'timestamp_test'}, {}, id='created_at'),
+    ])
+    def test_create_user(self, kwargs, expected):
+        """Created users should have an id, created_at and the given fields."""
+        user = User(**kwargs)
+        user.set_password('testpass123')
+        db.session.add(user)
+        db.session.flush()
+
+        assert user.id is not None
+        assert isinstance(user.created_at, datetime)
+        for attr, value in expected.items():
+            assert getattr(user, attr) == value, attr
+
+    def test_password_hashing(self):
         """Password should be hashed, not stored plain."""
-        from app.models import db, User
-        with app.app_context():
-            user = User(username='hashtest')
-            user.set_password('mypassword')
-            db.session.add(user)
-            db.session.commit()
-
-            assert user.password_hash != 'mypassword'
-            assert user.check_password('mypassword')
-            assert not user.check_password('wrongpassword')
-
-    def test_user_created_at(self, app):
-        """User should have created_at timestamp."""
-        from app.models import db, User
-        with app.app_context():
-            user = User(username='timestamp_test')
-            user.set_password('pass')
-            db.session.add(user)
-            db.session.commit()
-
-            assert user.created_at is not None
-            assert isinstance(user.created_at, datetime)
+        user = User(username='hashtest')
+        user.set_password('mypassword')
+        db.session.add(user)
+        db.session.flush()
+
+        assert user.password_hash != 'mypassword'
+        assert user.check_password('mypassword')
+        assert not user.check_password('wrongpassword')
 
 
 class TestBookModel:
     """Test Book model."""
 
-    def test_create_book(self, app):
-        """Can create a book."""
-        from app.models import db, Book
-        with app.app_context():
-            book = Book(
-                title='Peace in Kashmir',
-                author='Maulana Wahiduddin Khan',
-                slug='peace-in-kashmir'
-            )
-            db.session.add(book)
-            db.session.commit()
-
-            assert book.id is not None
-            assert book.title == 'Peace in Kashmir'
-            assert book.slug == 'peace-in-kashmir'
-
-    def test_book_status_default(self, app):
-        """Book status should default to 'draft'."""
-        from app.models import db, Book
-        with app.app_context():
-            book = Book(title='Test', slug='test')
-            db.session.add(book)
-            db.session.commit()
-
-            assert book.status == 'draft'
-
-    def test_book_locking(self, app):
+    @pytest.mark.parametrize("kwargs,expected", [
+        pytest.param({'title': 'Peace in Kashmir', 'author': 'Maulana Wahiduddin Khan',
+                      'slug': 'peace-in-kashmir'},
+                     {'title': 'Peace in Kashmir', 'slug': 'peace-in-kashmir'}, id='create'),
+        pytest.param({'title': 'Test', 'slug': 'test'}, {'status': 'draft'}, id='status_default'),
+    ])
+    def test_create_book(self, kwargs, expected):
+        """Created books should have an id and the expected fields."""
+        book = Book(**kwargs)
+        db.session.add(book)
+        db.session.flush()
+
+        assert book.id is not None
+        for attr, value in expected.items():
+            assert getattr(book, attr) == value, attr
+
+    def test_book_locking(self, user_ids):
         """Book should support locking."""
-        from app.models import db, Book, User
-        with app.app_context():
-            user = User(username='locker')
-            user.set_password('pass')
-            book = Book(title='Lockable', slug='lockable')
-            db.session.add_all([user, book])
-            db.session.commit()
+        book = Book(title='Lockable', slug='lockable')
+        db.session.add(book)
+        db.session.flush()
 
-            book.locked_by = user.id
-            db.session.commit()
+        book.locked_by = user_ids['annotator']
+        db.session.flush()
 
-            assert book.locked_by == user.id
+        assert book.locked_by == user_ids['annotator']
 
 
 class TestChapterModel:
     """Test Chapter model."""
 
-    def test_create_chapter(self, app):
+    def test_create_chapter(self):
         """Can create a chapter linked to a book."""
-        from app.models import db, Book, Chapter
-        with app.app_context():
-            book = Book(title='Test Book', slug='test-book')
-            db.session.add(book)
-            db.session.commit()
+        book = Book(title='Test Book', slug='test-book')
+        db.session.add(book)
+        db.session.flush()
 
-            chapter = Chapter(
-                book_id=book.id,
-                title='Introduction',
-                order_index=1
-            )
-            db.session.add(chapter)
-            db.session.commit()
+        chapter = Chapter(
+            book_id=book.id,
+            title='Introduction',
+            order_index=1
+        )
+        db.session.add(chapter)
+        db.session.flush()
 
-            assert chapter.id is not None
-            assert chapter.book_id == book.id
-            assert chapter.order_index == 1
+        assert chapter.id is not None
+        assert chapter.book_id == book.id
+        assert chapter.order_index == 1
+
+    def test_chapter_paragraphs(self, chapter, bulk_paragraphs):
+        """Chapter.paragraphs should return every paragraph in the chapter."""
+        bulk_paragraphs(chapter, 20)
+
+        assert chapter.paragraphs.count() == 20
 
 
 class TestParagraphModel:
     """Test Paragraph model."""
 
-    def test_create_paragraph(self, app):
-        """Can create a paragraph."""
-        from app.models import db, Book, Chapter, Paragraph
-        with app.app_context():
-            book = Book(title='Test', slug='test')
-            db.session.add(book)
-            db.session.commit()
-
-            chapter = Chapter(book_id=book.id, title='Ch1', order_index=1)
-            db.session.add(chapter)
-            db.session.commit()
-
-            para = Paragraph(
-                chapter_id=chapter.id,
-                text='This is a test paragraph.',
-                type='paragraph',
-                order_index=1
-            )
-            db.session.add(para)
-            db.session.commit()
-
-            assert para.id is not None
-            assert para.text == 'This is a test paragraph.'
-
-    def test_paragraph_page_info(self, app):
-        """Paragraph should store page number."""
-        from app.models import db, Book, Chapter, Paragraph
-        with app.app_context():
-            book = Book(title='Test', slug='test')
-            chapter = Chapter(book_id=1, title='Ch1', order_index=1)
-            db.session.add(book)
-            db.session.commit()
-            chapter.book_id = book.id
-            db.session.add(chapter)
-            db.session.commit()
-
-            para = Paragraph(
-                chapter_id=chapter.id,
-                text='Text on page 42',
-                type='paragraph',
-                order_index=1,
-                page_number=42
-            )
-            db.session.add(para)
-            db.session.commit()
-
-            assert para.page_number == 42
-
-    def test_paragraph_reviewed_flag(self, app):
+    @pytest.mark.parametrize("kwargs", [
+        pytest.param({'text': 'This is a test paragraph.'}, id='create'),
+        pytest.param({'text': 'Text on page 42', 'page_number': 42}, id='page_info'),
+    ])
+    def test_create_paragraph(self, chapter, kwargs):
+        """Created paragraphs should have an id and keep the given fields."""
+        para = Paragraph(chapter_id=chapter.id, type='paragraph', order_index=1, **kwargs)
+        db.session.add(para)
+        db.session.flush()
+
+        assert para.id is not None
+        for attr, value in kwargs.items():
+            assert getattr(para, attr) == value, attr
+
+    def test_paragraph_reviewed_flag(self, chapter):
         """Paragraph should have reviewed flag."""
-        from app.models import db, Book, Chapter, Paragraph
-        with app.app_context():
-            book = Book(title='Test', slug='test')
-            db.session.add(book)
-            db.session.commit()
-
-            chapter = Chapter(book_id=book.id, title='Ch1', order_index=1)
-            db.session.add(chapter)
-            db.session.commit()
-
-            para = Paragraph(
-                chapter_id=chapter.id,
-                text='Review me',
-                type='paragraph',
-                order_index=1
-            )
-            db.session.add(para)
-            db.session.commit()
-
-            assert para.reviewed is False
-            para.reviewed = True
-            db.session.commit()
-            assert para.reviewed is True
+        para = Paragraph(
+            chapter_id=chapter.id,
+            text='Review me',
+            type='paragraph',
+            order_index=1
+        )
+        db.session.add(para)
+        db.session.flush()
+
+        assert para.reviewed is False
+        para.reviewed = True
+        db.session.flush()
+        assert para.reviewed is True
 
 
 class TestGroupModel:
     """Test Group model."""
 
-    def test_create_group(self, app):
+    def test_create_group(self, book):
         """Can create a group."""
-        from app.models import db, Book, Group
-        with app.app_context():
-            book = Book(title='Test', slug='test')
-            db.session.add(book)
-            db.session.commit()
-
-            group = Group(
-                book_id=book.id,
-                token_count=650,
-                order_index=1
-            )
-            db.session.add(group)
-            db.session.commit()
+        group = Group(
+            book_id=book.id,
+            token_count=650,
+            order_index=1
+        )
+        db.session.add(group)
+        db.session.flush()
 
-            assert group.id is not None
-            assert group.token_count == 650
+        assert group.id is not None
+        assert group.token_count == 650
 
 
 class TestReferenceModel:
     """Test Reference model."""
 
-    def test_create_quran_reference(self, app):
+    def test_create_quran_reference(self, chapter):
         """Can create a Quran reference."""
-        from app.models import db, Book, Chapter, Paragraph, Reference
-        with app.app_context():
-            book = Book(title='Test', slug='test')
-            db.session.add(book)
-            db.session.commit()
-
-            chapter = Chapter(book_id=book.id, title='Ch1', order_index=1)
-            db.session.add(chapter)
-            db.session.commit()
-
-            para = Paragraph(
-                chapter_id=chapter.id,
-                text='See Quran 2:255',
-                type='paragraph',
-                order_index=1
-            )
-            db.session.add(para)
-            db.session.commit()
-
-            ref = Reference(
-                paragraph_id=para.id,
-                ref_type='quran',
-                surah=2,
-                ayah_start=255,
-                auto_detected=True
-            )
-            db.session.add(ref)
-            db.session.commit()
-
-            assert ref.id is not None
-            assert ref.ref_type == 'quran'
-            assert ref.surah == 2
-
-    def test_create_hadith_reference(self, app):
+        para = Paragraph(
+            chapter_id=chapter.id,
+            text='See Quran 2:255',
+            type='paragraph',
+            order_index=1
+        )
+        db.session.add(para)
+        db.session.flush()
+
+        ref = Reference(
+            paragraph_id=para.id,
+            ref_type='quran',
+            surah=2,
+            ayah_start=255,
+            auto_detected=True
+        )
+        db.session.add(ref)
+        db.session.flush()
+
+        assert ref.id is not None
+        assert ref.ref_type == 'quran'
+        assert ref.surah == 2
+
+    def test_create_hadith_reference(self, chapter):
         """Can create a Hadith reference."""
-        from app.models import db, Book, Chapter, Paragraph, Reference
-        with app.app_context():
-            book = Book(title='Test', slug='test')
-            db.session.add(book)
-            db.session.commit()
-
-            chapter = Chapter(book_id=book.id, title='Ch1', order_index=1)
-            db.session.add(chapter)
-            db.session.commit()
-
-            para = Paragraph(
-                chapter_id=chapter.id,
-                text='Bukhari 1234',
-                type='paragraph',
-                order_index=1
-            )
-            db.session.add(para)
-            db.session.commit()
-
-            ref = Reference(
-                paragraph_id=para.id,
-                ref_type='hadith',
-                collection='bukhari',
-                hadith_number='1234',
-                auto_detected=True
-            )
-            db.session.add(ref)
-            db.session.commit()
-
-            assert ref.ref_type == 'hadith'
-            assert ref.collection == 'bukhari'
+        para = Paragraph(
+            chapter_id=chapter.id,
+            text='Bukhari 1234',
+            type='paragraph',
+            order_index=1
+        )
+        db.session.add(para)
+        db.session.flush()
+
+        ref = Reference(
+            paragraph_id=para.id,
+            ref_type='hadith',
+            collection='bukhari',
+            hadith_number='1234',
+            auto_detected=True
+        )
+        db.session.add(ref)
+        db.session.flush()
+
+        assert ref.ref_type == 'hadith'
+        assert ref.collection == 'bukhari'
 
 
 class TestVersionModel:
     """Test Version model."""
 
-    def test_create_version(self, app):
+    def test_create_version(self):
         """Can create a version snapshot."""
-        from app.models import db, Book, User, Version
-        with app.app_context():
-            user = User(username='snapper')
-            user.set_password('pass')
-            book = Book(title='Test', slug='test')
-            db.session.add_all([user, book])
-            db.session.commit()
-
-            version = Version(
-                book_id=book.id,
-                snapshot='{"paragraphs": []}',
-                version_type='auto',
-                created_by=user.id
-            )
-            db.session.add(version)
-            db.session.commit()
-
-            assert version.id is not None
-            assert version.version_type == 'auto'
+        user = User(username='snapper')
+        user.set_password('pass')
+        book = Book(title='Test', slug='test')
+        db.session.add_all([user, book])
+        db.session.flush()
+
+        version = Version(
+            book_id=book.id,
+            snapshot='{"paragraphs": []}',
+            version_type='auto',
+            created_by=user.id
+        )
+        db.session.add(version)
+        db.session.flush()
+
+        assert version.id is not None
+        assert version.version_type == 'auto'
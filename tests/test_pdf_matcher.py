@@ -2,67 +2,89 @@
 import pytest
 from pathlib import Path
 
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
+from app.services import pdf_matcher
 from app.services.pdf_matcher import (
     extract_pdf_pages,
     match_paragraph_to_page,
     match_paragraphs_to_pdf,
-    calculate_similarity
+    calculate_similarity,
+    normalize_text,
+    build_page_index,
 )
 
 FIXTURES_DIR = Path(__file__).parent / 'fixtures'
 
 
+@pytest.fixture(scope='module')
+def pdf_pages():
+    """Return a loader that extracts each fixture PDF once per module.
+
+    Matching never modifies the page dicts, so tests can share them.
+    """
+    extracted = {}
+
+    def load(name):
+        if name not in extracted:
+            extracted[name] = extract_pdf_pages(FIXTURES_DIR / name)
+        return extracted[name]
+    return load
+
+
 class TestExtractPdfPages:
     """Test PDF page extraction."""
 
-    def test_extract_simple_pdf(self):
+    def test_extract_simple_pdf(self, pdf_pages):
         """Extract pages from simple PDF."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'simple.pdf')
+        pages = pdf_pages('simple.pdf')
         assert len(pages) == 3
 
-    def test_extract_returns_list(self):
+    def test_extract_returns_list(self, pdf_pages):
         """Result should be a list of page dicts."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'simple.pdf')
+        pages = pdf_pages('simple.pdf')
         assert isinstance(pages, list)
         assert all(isinstance(p, dict) for p in pages)
 
-    def test_page_has_required_fields(self):
+    def test_page_has_required_fields(self, pdf_pages):
         """Each page should have page_number and text."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'simple.pdf')
+        pages = pdf_pages('simple.pdf')
         for page in pages:
             assert 'page_number' in page
             assert 'text' in page
 
-    def test_page_numbers_start_at_one(self):
+    def test_page_has_word_sets(self, pdf_pages):
+        """Each page should carry its normalized words for reuse in matching."""
+        pages = pdf_pages('simple.pdf')
+        for page in pages:
+            assert page['words'] == tuple(page['text_normalized'].split())
+            assert page['words_set'] == frozenset(page['words'])
+
+    def test_page_numbers_start_at_one(self, pdf_pages):
         """Page numbers should start at 1."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'simple.pdf')
+        pages = pdf_pages('simple.pdf')
         assert pages[0]['page_number'] == 1
 
-    def test_page_numbers_sequential(self):
+    def test_page_numbers_sequential(self, pdf_pages):
         """Page numbers should be sequential."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'book_like.pdf')
+        pages = pdf_pages('book_like.pdf')
         page_nums = [p['page_number'] for p in pages]
         assert page_nums == list(range(1, len(pages) + 1))
 
-    def test_extract_text_content(self):
+    def test_extract_text_content(self, pdf_pages):
         """Text content should be extracted."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'simple.pdf')
+        pages = pdf_pages('simple.pdf')
         assert 'page' in pages[0]['text'].lower()
 
-    def test_extract_empty_pages(self):
+    def test_extract_empty_pages(self, pdf_pages):
         """Empty pages should still be returned with empty text."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'empty_pages.pdf')
+        pages = pdf_pages('empty_pages.pdf')
         assert len(pages) == 2
         # Empty pages have empty or whitespace-only text
         for page in pages:
             assert page['text'].strip() == ''
 
-    def test_single_page_pdf(self):
+    def test_single_page_pdf(self, pdf_pages):
         """Single page PDF should return one page."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'single_page.pdf')
+        pages = pdf_pages('single_page.pdf')
         assert len(pages) == 1
         assert pages[0]['page_number'] == 1
 
@@ -72,6 +94,22 @@ class TestExtractPdfPages:
             extract_pdf_pages(FIXTURES_DIR / 'nonexistent.pdf')
 
 
+class TestNormalizeText:
+    """Test text normalization for comparison."""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("Hello World", "hello world"),
+        ("  padded\ttext\n", "padded text"),
+        ("line one\n\nline two", "line one line two"),
+        ("non\u00a0breaking\u2003space", "non breaking space"),
+        ("QUR'ĀN", "qur'ān"),
+        ("", ""),
+    ])
+    def test_normalize(self, text, expected):
+        """Text should be lowercased with whitespace collapsed and stripped."""
+        assert normalize_text(text) == expected
+
+
 class TestCalculateSimilarity:
     """Test text similarity calculation."""
 
@@ -104,6 +142,17 @@ class TestCalculateSimilarity:
         s2 = calculate_similarity(text2, text1)
         assert abs(s1 - s2) < 0.3
 
+    def test_precomputed_word_set_gives_same_score(self):
+        """Passing the target's word set should not change the score."""
+        target = "peace is very important"
+        words = frozenset(target.split())
+        assert calculate_similarity("peace is important", target, words) == \
+            calculate_similarity("peace is important", target)
+
+    def test_no_whole_word_overlap_scores_zero(self):
+        """Fragments inside longer words should not count as a phrase match."""
+        assert calculate_similarity("age rage", "the page was torn") == 0.0
+
 
 class TestMatchParagraphToPage:
     """Test matching single paragraph to pages."""
@@ -114,48 +163,97 @@ class TestMatchParagraphToPage:
         ("This is page 2", 2),
         ("This is page 3", 3),
     ])
-    def test_exact_match(self, para_text, expected_page):
+    def test_exact_match(self, pdf_pages, para_text, expected_page):
         """Exact text should match correct page."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'simple.pdf')
+        pages = pdf_pages('simple.pdf')
         result = match_paragraph_to_page(para_text, pages)
         assert result['page_number'] == expected_page
 
-    def test_partial_match(self):
+    def test_partial_match(self, pdf_pages):
         """Partial text should still match."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'simple.pdf')
+        pages = pdf_pages('simple.pdf')
         result = match_paragraph_to_page("sample text for testing", pages)
         # Should match one of the pages
         assert result['page_number'] is not None
         assert result['confidence'] > 0.3
 
-    def test_no_match_returns_none(self):
+    def test_no_match_returns_none(self, pdf_pages):
         """No matching text should return None page."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'simple.pdf')
+        pages = pdf_pages('simple.pdf')
         result = match_paragraph_to_page("completely unrelated xyz abc 123", pages)
         assert result['page_number'] is None
         assert result['confidence'] < 0.3
 
-    def test_match_includes_confidence(self):
+    def test_match_includes_confidence(self, pdf_pages):
         """Match result should include confidence score."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'simple.pdf')
+        pages = pdf_pages('simple.pdf')
         result = match_paragraph_to_page("This is page 1", pages)
         assert 'confidence' in result
         assert 0.0 <= result['confidence'] <= 1.0
 
-    def test_high_confidence_for_exact(self):
+    def test_high_confidence_for_exact(self, pdf_pages):
         """Exact matches should have high confidence."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'multi_para.pdf')
+        pages = pdf_pages('multi_para.pdf')
         result = match_paragraph_to_page("The concept of peace is fundamental to Islamic teachings", pages)
         assert result['confidence'] > 0.7
 
-    def test_match_multi_paragraph_pdf(self):
+    def test_match_multi_paragraph_pdf(self, pdf_pages):
         """Should match in multi-paragraph PDF."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'multi_para.pdf')
+        pages = pdf_pages('multi_para.pdf')
         result = match_paragraph_to_page("Prophet Muhammad emphasized mercy and compassion", pages)
         assert result['page_number'] == 1
         assert result['confidence'] > 0.5
 
 
+class TestPageIndex:
+    """Test the inverted word index used for candidate pruning."""
+
+    def test_index_maps_words_to_page_positions(self):
+        """Each word should list the positions of pages containing it."""
+        pages = [
+            {'page_number': 1, 'text': 'Mercy and patience'},
+            {'page_number': 2, 'text': 'Patience in hardship'},
+        ]
+        index = build_page_index(pages)
+        assert index['patience'] == [0, 1]
+        assert index['mercy'] == [0]
+
+    def test_prebuilt_index_gives_same_result(self, pdf_pages):
+        """Passing a prebuilt index should not change the match."""
+        pages = pdf_pages('book_like.pdf')
+        index = build_page_index(pages)
+        text = "Detailed information about the subject"
+        assert match_paragraph_to_page(text, pages, page_index=index) == \
+            match_paragraph_to_page(text, pages)
+
+    def test_phrase_across_word_fragments_still_wins(self):
+        """A page whose best phrase starts and ends mid-word should still be found."""
+        pages = [
+            {'page_number': 1, 'text': 'merciful lord and the kind one'},
+            {'page_number': 2, 'text': 'the unmercy of winter came'},
+        ]
+        result = match_paragraph_to_page("mercy of wint", pages)
+        assert result['page_number'] == 2
+
+    def test_containment_with_fragment_ends_scores_exact(self):
+        """Text contained mid-word at both ends should still be an exact match."""
+        pages = [
+            {'page_number': 1, 'text': 'mercy of winter'},
+            {'page_number': 2, 'text': 'the unmercy of winterfell'},
+        ]
+        result = match_paragraph_to_page("nmercy of winterf", pages)
+        assert result == {'page_number': 2, 'confidence': 1.0}
+
+    def test_ties_go_to_earliest_page(self):
+        """Equal scores should resolve to the first page."""
+        pages = [
+            {'page_number': 1, 'text': 'alpha gamma'},
+            {'page_number': 2, 'text': 'alpha gamma'},
+        ]
+        result = match_paragraph_to_page("alpha beta", pages)
+        assert result['page_number'] == 1
+
+
 class TestMatchParagraphsToPdf:
     """Test batch matching of paragraphs to PDF."""
 
@@ -200,27 +298,47 @@ class TestMatchParagraphsToPdf:
         result_ids = [r['paragraph_id'] for r in results]
         assert result_ids == [3, 1, 2]
 
+    def test_repeated_text_matched_once(self, monkeypatch):
+        """Paragraphs with the same text should share one match."""
+        calls = []
+        original = pdf_matcher.match_paragraph_to_page
+
+        def counted(para_text, *args, **kwargs):
+            calls.append(para_text)
+            return original(para_text, *args, **kwargs)
+
+        monkeypatch.setattr(pdf_matcher, 'match_paragraph_to_page', counted)
+        paragraphs = [
+            {'id': 1, 'text': 'This is page 2'},
+            {'id': 2, 'text': 'This is page 1'},
+            {'id': 3, 'text': 'This is page 2'},
+        ]
+        results = match_paragraphs_to_pdf(paragraphs, FIXTURES_DIR / 'simple.pdf')
+        assert calls == ['This is page 2', 'This is page 1']
+        assert [r['page_number'] for r in results] == [2, 1, 2]
+        assert [r['paragraph_id'] for r in results] == [1, 2, 3]
+
 
 class TestBookLikePdf:
     """Test with book-like PDF structure."""
 
-    def test_match_chapter_heading(self):
+    def test_match_chapter_heading(self, pdf_pages):
         """Chapter headings should match correct pages."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'book_like.pdf')
+        pages = pdf_pages('book_like.pdf')
         result = match_paragraph_to_page("Chapter One: Introduction", pages)
         assert result['page_number'] == 1
         assert result['confidence'] > 0.7
 
-    def test_match_chapter_two(self):
+    def test_match_chapter_two(self, pdf_pages):
         """Second chapter should match page 3."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'book_like.pdf')
+        pages = pdf_pages('book_like.pdf')
         result = match_paragraph_to_page("Chapter Two: Main Content", pages)
         assert result['page_number'] == 3
         assert result['confidence'] > 0.7
 
-    def test_match_content_on_later_page(self):
+    def test_match_content_on_later_page(self, pdf_pages):
         """Content on later pages should be found."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'book_like.pdf')
+        pages = pdf_pages('book_like.pdf')
         result = match_paragraph_to_page("Detailed information about the subject", pages)
         assert result['page_number'] == 4
 
@@ -228,31 +346,31 @@ class TestBookLikePdf:
 class TestEdgeCases:
     """Test edge cases and error handling."""
 
-    def test_very_short_text(self):
+    def test_very_short_text(self, pdf_pages):
         """Very short text should still attempt matching."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'simple.pdf')
+        pages = pdf_pages('simple.pdf')
         result = match_paragraph_to_page("page", pages)
         # Short text might match but with low confidence
         assert 'page_number' in result
         assert 'confidence' in result
 
-    def test_special_characters(self):
+    def test_special_characters(self, pdf_pages):
         """Special characters should be handled."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'simple.pdf')
+        pages = pdf_pages('simple.pdf')
         result = match_paragraph_to_page("text with 'quotes' and (parens)", pages)
         # Should not crash
         assert 'page_number' in result
 
-    def test_unicode_text(self):
+    def test_unicode_text(self, pdf_pages):
         """Unicode text should be handled."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'simple.pdf')
+        pages = pdf_pages('simple.pdf')
         result = match_paragraph_to_page("Qur'ān reference — test", pages)
         # Should not crash
         assert 'page_number' in result
 
-    def test_whitespace_normalization(self):
+    def test_whitespace_normalization(self, pdf_pages):
         """Whitespace variations should be normalized."""
-        pages = extract_pdf_pages(FIXTURES_DIR / 'simple.pdf')
+        pages = pdf_pages('simple.pdf')
         # Extra spaces shouldn't prevent matching
         result = match_paragraph_to_page("This   is    page  1", pages)
         assert result['page_number'] == 1
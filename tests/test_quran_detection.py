@@ -1,9 +1,5 @@
 """Tests for Quran reference detection."""
 import pytest
-from pathlib import Path
-
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.services.quran_detector import detect_quran_refs, normalize_surah_name, SURAH_NAMES
 
@@ -119,6 +115,7 @@ class TestDetectQuranRefs:
         "Quran 999:999",  # Invalid surah (only 114)
         "Quran 2:300",  # Invalid ayah (Baqarah has 286)
         "Quran 0:1",  # Invalid surah (starts at 1)
+        "The Quran speaks of every verse and ayah",  # Keywords but no numbers
     ])
     def test_no_match_cases(self, text):
         """Non-Quran text should return empty list."""
@@ -166,6 +163,11 @@ class TestNormalizeSurahName:
         assert normalize_surah_name("NotASurah") is None
         assert normalize_surah_name("") is None
 
+    def test_already_lower_skips_lowercasing(self):
+        """Pre-lowercased names should resolve without re-lowercasing."""
+        assert normalize_surah_name("al-baqarah", already_lower=True) == 2
+        assert normalize_surah_name("", already_lower=True) is None
+
 
 class TestSurahNameMapping:
     """Test surah name to number mapping."""
@@ -214,3 +216,9 @@ class TestComplexTexts:
         assert len(refs) >= 1
         assert refs[0]['surah'] == 2
         assert refs[0]['ayah_start'] == 255
+
+    def test_case_changing_characters_keep_offsets(self):
+        """Text whose lowercase form changes length should still resolve names."""
+        text = "\u0130stanbul readers recite Surah Al-Kahf on Fridays"
+        refs = detect_quran_refs(text)
+        assert [r['surah'] for r in refs] == [18]